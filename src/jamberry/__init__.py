@@ -1,4 +1,25 @@
-from .consultant import Consultant
+from .consultant import Consultant, ConsultantActivityRecord
+from .customer import Customer
 from .order import Order, OrderLineItem
 from .product import Product
-from .workstation import Workstation, JamberryWorkstation
+
+# The workstation pulls in mechanicalsoup, requests and bs4, so it is only imported on first
+# access. Code that just parses stored data (see jamberry.parsers) never pays for it.
+_lazy = {
+    'Workstation': '.workstation',
+    'JamberryWorkstation': '.workstation',
+    'OrderNotFoundException': '.workstation',
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        from importlib import import_module
+        value = getattr(import_module(_lazy[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
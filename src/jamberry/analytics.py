@@ -0,0 +1,182 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from heapq import nlargest
+from typing import Iterable, List, Tuple
+
+from .order import Order
+from .util import currency_to_decimal
+
+
+def _to_decimal(value) -> Decimal:
+    """Amounts may be Decimals, numbers, or (from `extract_line_items`) strings that could not
+    be parsed; those count as 0 rather than failing the whole order."""
+    if value is None or value == '':
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        value = currency_to_decimal(str(value))
+        return value if isinstance(value, Decimal) else Decimal(0)
+
+
+def period_key(date, period='month') -> str:
+    """Returns the bucket label for `date`: '2018-03' (month), '2018-Q1' (quarter) or '2018' (year)."""
+    if period == 'month':
+        return f'{date.year:04d}-{date.month:02d}'
+    if period == 'quarter':
+        return f'{date.year:04d}-Q{(date.month - 1) // 3 + 1}'
+    if period == 'year':
+        return f'{date.year:04d}'
+    raise ValueError(f'unknown period {period!r}')
+
+
+class SalesIndex:
+    """Incrementally maintained sales rollups over an order history.
+
+    Feed it orders (e.g. from `JamberryWorkstation.orders()`) with `add_order` or `add_orders`.
+    Each order is folded into per-SKU, per-customer and per-period aggregates as it arrives,
+    so the queries below never rescan the history. Adding an order with an id that has already
+    been seen replaces the earlier copy, which makes it safe to re-feed overlapping date ranges."""
+
+    def __init__(self, period='month'):
+        period_key(datetime.min, period)  # validate early
+        self.period = period
+        self._orders = {}  # order id -> (customer_id, period, qv, total, ((sku, quantity, total), ...))
+        self._sku_units = defaultdict(Counter)  # sku -> period -> units
+        self._sku_sales = defaultdict(Counter)  # sku -> period -> sales total
+        self._period_units = Counter()
+        self._period_sales = Counter()
+        self._period_qv = Counter()
+        self._customer_qv = Counter()
+        self._customer_sales = Counter()
+        self._customer_orders = Counter()
+        self._customer_names = {}
+        self._repeat_customers = 0
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def add_orders(self, orders: Iterable[Order]):
+        for order in orders:
+            self.add_order(order)
+        return self
+
+    def add_order(self, order: Order):
+        if order.id in self._orders:
+            self.remove_order(order.id)
+        line_items = tuple(
+            (li.sku, int(li.quantity or 0), _to_decimal(li.total))
+            for li in (getattr(order, 'line_items', None) or ())
+        )
+        customer_id = getattr(order, 'customer_id', None)
+        entry = (
+            customer_id,
+            period_key(order.order_date, self.period),
+            _to_decimal(getattr(order, 'qv', None)),
+            _to_decimal(getattr(order, 'total', None)),
+            line_items,
+        )
+        self._orders[order.id] = entry
+        if customer_id is not None and getattr(order, 'customer_name', None):
+            self._customer_names[customer_id] = order.customer_name
+        self._apply(entry, 1)
+
+    def remove_order(self, order_id):
+        entry = self._orders.pop(order_id)
+        self._apply(entry, -1)
+
+    def _apply(self, entry, sign):
+        customer_id, period, qv, total, line_items = entry
+        for sku, quantity, line_total in line_items:
+            self._sku_units[sku][period] += sign * quantity
+            self._sku_sales[sku][period] += sign * line_total
+            self._period_units[period] += sign * quantity
+            self._period_sales[period] += sign * line_total
+        self._period_qv[period] += sign * qv
+        if customer_id is None:
+            return
+        before = self._customer_orders[customer_id]
+        after = before + sign
+        self._customer_orders[customer_id] = after
+        self._customer_qv[customer_id] += sign * qv
+        self._customer_sales[customer_id] += sign * total
+        if before < 2 <= after:
+            self._repeat_customers += 1
+        elif after < 2 <= before:
+            self._repeat_customers -= 1
+        if after == 0:
+            del self._customer_orders[customer_id]
+            del self._customer_qv[customer_id]
+            del self._customer_sales[customer_id]
+
+    def units_sold(self, sku, period=None) -> int:
+        """Units of `sku` sold in `period` (a label from `period_key`), or across all periods."""
+        by_period = self._sku_units.get(sku)
+        if by_period is None:
+            return 0
+        if period is None:
+            return sum(by_period.values())
+        return by_period[period]
+
+    def units_by_period(self, sku) -> List[Tuple[str, int]]:
+        """Chronological (period, units) pairs for `sku`."""
+        return sorted((p, n) for p, n in self._sku_units.get(sku, {}).items() if n)
+
+    def sku_sales(self, sku, period=None) -> Decimal:
+        by_period = self._sku_sales.get(sku)
+        if by_period is None:
+            return Decimal(0)
+        if period is None:
+            return sum(by_period.values(), Decimal(0))
+        return by_period[period]
+
+    def top_skus(self, n=10, period=None) -> List[Tuple[str, int]]:
+        """The `n` best selling SKUs by units, optionally limited to one period."""
+        totals = ((sku, self.units_sold(sku, period)) for sku in self._sku_units)
+        return nlargest(n, (t for t in totals if t[1]), key=lambda t: t[1])
+
+    def period_totals(self, period) -> Tuple[int, Decimal, Decimal]:
+        """(units, sales, qv) for one period."""
+        return self._period_units[period], self._period_sales[period], self._period_qv[period]
+
+    def periods(self) -> List[str]:
+        return sorted(p for p, qv in self._period_qv.items() if qv or self._period_units[p])
+
+    def customer_qv(self, customer_id) -> Decimal:
+        return self._customer_qv.get(customer_id, Decimal(0))
+
+    def customer_order_count(self, customer_id) -> int:
+        return self._customer_orders.get(customer_id, 0)
+
+    def customer_name(self, customer_id):
+        return self._customer_names.get(customer_id)
+
+    def top_customers(self, n=10, by='qv') -> List[Tuple[str, Decimal]]:
+        """The `n` customers with the highest total QV (or `by='sales'` for order totals)."""
+        if by == 'qv':
+            totals = self._customer_qv
+        elif by == 'sales':
+            totals = self._customer_sales
+        else:
+            raise ValueError(f'unknown ranking {by!r}')
+        return nlargest(n, totals.items(), key=lambda t: t[1])
+
+    @property
+    def customer_count(self) -> int:
+        return len(self._customer_orders)
+
+    @property
+    def repeat_customer_count(self) -> int:
+        return self._repeat_customers
+
+    def repeat_purchase_rate(self) -> float:
+        """Fraction of customers that have placed more than one order."""
+        if not self._customer_orders:
+            return 0.0
+        return self._repeat_customers / len(self._customer_orders)
@@ -0,0 +1,101 @@
+from typing import Iterable, Iterator, List, Tuple
+
+
+class Batch:
+    """A group of parsed records plus where they came from.
+
+    `cursor` is the (page, offset) position of the first record in the source, and
+    `next_cursor` the position right after the last one: after the batch has been written
+    somewhere, pass `next_cursor` as `resume_from` to the same `*_batches` call to continue
+    from there. Offsets count raw source records, so filtered-out records are skipped too."""
+    __slots__ = (
+        'source',
+        'page',
+        'items',
+        'cursor',
+        'next_cursor',
+    )
+
+    def __init__(self, source, page, items, cursor, next_cursor):
+        self.source = source
+        self.page = page
+        self.items = items
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        items = self.items
+        if isinstance(items, tuple):
+            items = items[0]
+        if isinstance(items, dict):
+            return len(next(iter(items.values()), ()))
+        return len(items)
+
+    def __repr__(self):
+        return f'<Batch {self.source} page={self.page} cursor={self.cursor} size={len(self)}>'
+
+
+def _columns(objects) -> dict:
+    if not objects:
+        return {}
+    slots = type(objects[0]).__slots__
+    return {name: [getattr(o, name, None) for o in objects] for name in slots}
+
+
+def to_columns(items: List):
+    """Column-oriented form of a list of records: {slot: [values]} for model objects, or a
+    tuple of such dicts for tuple records like (Consultant, ConsultantActivityRecord).
+    Unset slots become None."""
+    if items and isinstance(items[0], tuple):
+        return tuple(_columns([item[i] for item in items]) for i in range(len(items[0])))
+    return _columns(items)
+
+
+def resume_position(resume_from) -> Tuple[int, int]:
+    if resume_from is None:
+        return 0, 0
+    page, offset = resume_from
+    return int(page), int(offset)
+
+
+def page_entries(page, records, parse, row_filter=None, skip=0):
+    """One page for `batched`: `parse` applied to each raw record from offset `skip` on that
+    `row_filter` (if any) accepts."""
+    records = list(records)
+    entries = [
+        (offset, parse(record))
+        for offset, record in enumerate(records)
+        if offset >= skip and (row_filter is None or row_filter(record))
+    ]
+    return page, len(records), entries
+
+
+def batched(source, pages: Iterable[Tuple[int, int, List[Tuple[int, object]]]], batch_size=None,
+            columnar=False) -> Iterator[Batch]:
+    """Groups records into Batches.
+
+    `pages` yields (page number, raw records on the page, [(offset, record), ...]). With no
+    `batch_size`, every page becomes one batch (possibly empty, so its cursor can still be
+    committed); otherwise batches hold `batch_size` records and may span pages."""
+    pending = []
+    cursor = None
+    next_cursor = None
+    for page, page_length, entries in pages:
+        end_of_page = (page + 1, 0)
+        if batch_size is None:
+            first = (page, entries[0][0]) if entries else end_of_page
+            items = [record for _, record in entries]
+            yield Batch(source, page, to_columns(items) if columnar else items, first, end_of_page)
+            continue
+        for offset, record in entries:
+            if not pending:
+                cursor = (page, offset)
+            pending.append(record)
+            next_cursor = (page, offset + 1) if offset + 1 < page_length else end_of_page
+            if len(pending) == batch_size:
+                yield Batch(source, cursor[0], to_columns(pending) if columnar else pending, cursor, next_cursor)
+                pending = []
+        if pending:
+            next_cursor = end_of_page
+    if pending:
+        yield Batch(source, cursor[0], to_columns(pending) if columnar else pending, cursor, next_cursor)
@@ -0,0 +1,49 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+def default_store_path() -> Path:
+    return Path.home() / '.jamberry' / 'search_carts.json'
+
+
+class SearchCartStore:
+    """Remembers the temporary search cart URL of each account in a small JSON file, so
+    workstations in other sessions and processes can reuse the cart instead of creating one.
+
+    Writes go to a temporary file that is then renamed over the store, so concurrent processes
+    never see a half-written file; the worst a race can do is create one extra cart."""
+
+    def __init__(self, path=None, clock=time.time):
+        self.path = Path(path) if path is not None else default_store_path()
+        self.clock = clock
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+        os.replace(str(tmp), str(self.path))
+
+    def get(self, username):
+        """(cart url, time it was last known to work), or None."""
+        entry = self._read().get(username)
+        if not entry:
+            return None
+        return entry['url'], entry['validated']
+
+    def put(self, username, url):
+        data = self._read()
+        data[username] = dict(url=url, validated=self.clock())
+        self._write(data)
+
+    def forget(self, username):
+        data = self._read()
+        if data.pop(username, None) is not None:
+            self._write(data)
@@ -0,0 +1,119 @@
+import threading
+import time
+from functools import wraps
+
+from .deadline import DeadlineExceeded, current_deadline
+
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+ERROR = 'error'
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+BASELINE_WEIGHT = 0.2
+
+
+def _endpoint(method=None, url=None, *args, **kwargs):
+    """(method, scheme://host/path) of a `Session.request` call, ignoring the query string."""
+    url = kwargs.get('url', url)
+    return kwargs.get('method', method), str(url).split('?', 1)[0]
+
+
+def classify_response(resp) -> str:
+    if resp.status_code in THROTTLE_STATUS_CODES:
+        return THROTTLED
+    if resp.status_code >= 500:
+        return ERROR
+    return SUCCESS
+
+
+class AdaptiveLimiter:
+    """Limits how many requests are in flight at once and adapts the limit AIMD-style.
+
+    Every successful request raises the limit by `increase / limit` (about `increase` per round
+    of requests); a throttled (429/503) or failed (5xx, connection error) request, or a slow one,
+    multiplies it by `decrease`. Only one decrease is applied per round: requests that started
+    before the last decrease do not cut the limit again.
+
+    A request is slow when it takes longer than `latency_target` seconds, or longer than
+    `latency_factor` times the usual latency of its endpoint (a moving average of successful
+    requests, used once `baseline_samples` have been seen) and at least `latency_floor` seconds.
+    The relative test is on by default,
+    so a small JSON page and a large TAR download are each judged against their own history."""
+
+    def __init__(self, initial=4, minimum=1, maximum=16, increase=1.0, decrease=0.5, latency_target=None,
+                 latency_factor=4.0, baseline_samples=5, latency_floor=0.5, clock=time.monotonic):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency_factor = latency_factor
+        self.baseline_samples = baseline_samples
+        self.latency_floor = latency_floor
+        self.clock = clock
+        self._baselines = {}  # endpoint -> [samples seen, average latency]
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=None) -> float:
+        """Waits for a free slot and returns the start time to pass to `release`."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                raise DeadlineExceeded
+            self.in_flight += 1
+            return self.clock()
+
+    def _is_slow(self, latency, outcome, endpoint) -> bool:
+        if self.latency_target is not None and latency > self.latency_target:
+            return True
+        if self.latency_factor is None or outcome != SUCCESS:
+            return False
+        baseline = self._baselines.setdefault(endpoint, [0, latency])
+        slow = baseline[0] >= self.baseline_samples and latency > max(self.latency_factor * baseline[1],
+                                                                     self.latency_floor)
+        baseline[0] += 1
+        baseline[1] += (latency - baseline[1]) * BASELINE_WEIGHT
+        return slow
+
+    def release(self, started, outcome=SUCCESS, endpoint=None):
+        """Frees the slot taken by `acquire`; `endpoint` (e.g. the URL path) selects the latency
+        baseline the request is compared with."""
+        with self._condition:
+            self.in_flight -= 1
+            now = self.clock()
+            slow = self._is_slow(now - started, outcome, endpoint)
+            if outcome in (THROTTLED, ERROR) or slow:
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+            elif outcome == SUCCESS:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    def governed(self, request):
+        """Wraps a `Session.request`-like callable so that every call takes a slot and reports
+        its outcome. While a deadline is active, waiting for a slot is bounded by it too."""
+        @wraps(request)
+        def wrapper(*args, **kwargs):
+            deadline = current_deadline()
+            started = self.acquire(None if deadline is None else deadline.remaining())
+            outcome = None
+            try:
+                resp = request(*args, **kwargs)
+                outcome = classify_response(resp)
+                return resp
+            except DeadlineExceeded:
+                raise
+            except Exception:
+                # a timeout caused by the deadline says nothing about the server
+                if deadline is None or not deadline.expired:
+                    outcome = ERROR
+                raise
+            finally:
+                self.release(started, outcome, _endpoint(*args, **kwargs))
+
+        return wrapper
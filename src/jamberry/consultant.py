@@ -1,4 +1,7 @@
-class Consultant:
+from .model import Model
+
+
+class Consultant(Model):
     __slots__ = (
         'id',
         'downline_level',
@@ -27,7 +30,7 @@ class Consultant:
         return f'{self.address_line1}\n{self.address_city}, {self.address_state} {self.address_zip}'
 
 
-class ConsultantActivityRecord:
+class ConsultantActivityRecord(Model):
     __slots__ = (
         'timestamp',
         'activity_report_date',
@@ -1,4 +1,7 @@
-class Customer:
+from .model import Model
+
+
+class Customer(Model):
     """This class represents a customer, and is primarily useful for storing contact information. The workstation
     also provides information such as total sales to the customer and the customer's original consultant."""
     __slots__ = (
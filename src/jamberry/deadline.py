@@ -0,0 +1,126 @@
+import threading
+import time
+from functools import wraps
+
+_active = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """A point in time after which work should stop. While a deadline is active in a thread
+    (see `activate`), every workstation HTTP request made from that thread gets a timeout no
+    longer than the time remaining, and is refused once the deadline has passed."""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    @classmethod
+    def coerce(cls, value):
+        """Accepts None, a number of seconds, or a Deadline."""
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(value)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.clock() >= self.expires_at
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded
+
+    def activate(self):
+        return _Activation(self)
+
+    def bind(self, f):
+        """Wraps `f` so that it runs with this deadline active, e.g. in a worker thread."""
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with self.activate():
+                return f(*args, **kwargs)
+
+        return wrapper
+
+
+class _Activation:
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def __enter__(self):
+        self.previous = getattr(_active, 'deadline', None)
+        _active.deadline = self.deadline
+        return self.deadline
+
+    def __exit__(self, *exc_info):
+        _active.deadline = self.previous
+
+
+def current_deadline():
+    """The deadline active in this thread, if any."""
+    return getattr(_active, 'deadline', None)
+
+
+def bind_current(f):
+    """Wraps `f` to run with the calling thread's deadline (if any) active; for handing work to
+    thread pools."""
+    deadline = current_deadline()
+    return f if deadline is None else deadline.bind(f)
+
+
+class PartialResult:
+    """Iterator over results that may be cut short by a deadline.
+
+    The wrapped iterator runs with the deadline active. When the deadline passes, between items
+    or during a request, iteration stops cleanly and `complete` is False. `complete` becomes
+    True once the wrapped iterator is exhausted."""
+
+    def __init__(self, iterable, deadline: Deadline):
+        self._iterator = iter(iterable)
+        self.deadline = deadline
+        self.complete = False
+        self.finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.finished:
+            raise StopIteration
+        try:
+            if self.deadline.expired:
+                raise DeadlineExceeded
+            with self.deadline.activate():
+                return next(self._iterator)
+        except StopIteration:
+            self.complete = True
+            self.finished = True
+            raise
+        except DeadlineExceeded:
+            self.finished = True
+            close = getattr(self._iterator, 'close', None)
+            if close is not None:
+                try:
+                    with self.deadline.activate():
+                        close()
+                except DeadlineExceeded:
+                    pass
+            raise StopIteration
+
+    def __repr__(self):
+        state = 'complete' if self.complete else 'running' if not self.finished else 'incomplete'
+        return f'<PartialResult {state}>'
+
+
+def bounded(iterable, deadline):
+    """`iterable` wrapped in a PartialResult if a deadline (seconds or Deadline) is given."""
+    deadline = Deadline.coerce(deadline)
+    if deadline is None:
+        return iterable
+    return PartialResult(iterable, deadline)
@@ -0,0 +1,166 @@
+import heapq
+import io
+import pickle
+import tempfile
+from csv import DictReader
+from decimal import Decimal
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from .util import currency_to_decimal
+
+
+class TarChange:
+    """Base class for the events produced by `diff_team_activity`. `old` and `new` are the
+    compared values (None when the consultant is missing from that snapshot)."""
+    __slots__ = (
+        'contact',
+        'name',
+        'old',
+        'new',
+    )
+
+    def __init__(self, contact, name, old, new):
+        self.contact = contact
+        self.name = name
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.contact!r}, {self.name!r}, {self.old!r}, {self.new!r})'
+
+
+class NewConsultant(TarChange):
+    """A consultant in the new snapshot only. `new` is the new title."""
+    __slots__ = ()
+
+
+class DroppedConsultant(TarChange):
+    """A consultant in the old snapshot only. `old` is the old title."""
+    __slots__ = ()
+
+
+class TitleChange(TarChange):
+    __slots__ = ()
+
+
+class StatusChange(TarChange):
+    __slots__ = ()
+
+
+class VolumeChange(TarChange):
+    """QV moved by at least the diff's volume threshold."""
+    __slots__ = ()
+
+    @property
+    def delta(self):
+        return (self.new or 0) - (self.old or 0)
+
+
+def _sort_key(contact):
+    return (0, int(contact), '') if contact.isdigit() else (1, 0, contact)
+
+
+def _decimal_or_none(value):
+    value = currency_to_decimal(value) if isinstance(value, str) else value
+    return value if isinstance(value, Decimal) else None
+
+
+def _snapshot_entry(item):
+    """(sort key, contact, name, title, status, qv) from a raw TAR row or a parsed pair."""
+    if isinstance(item, tuple):
+        c, a = item
+        contact = str(c.id)
+        name = f"{getattr(c, 'first_name', '')} {getattr(c, 'last_name', '')}".strip()
+        title, status, qv = getattr(a, 'title', None), getattr(a, 'status', None), getattr(a, 'qv', None)
+    else:
+        contact = item['Contact']
+        name = f"{item.get('First', '')} {item.get('Last', '')}".strip()
+        title, status, qv = item.get('Title'), item.get('Status'), item.get('QV')
+    return _sort_key(contact), contact, name, title, status, _decimal_or_none(qv)
+
+
+def tar_snapshot(source) -> Iterator[tuple]:
+    """Streams compact snapshot entries from TAR CSV bytes, a file object opened on a TAR CSV,
+    or an iterable of raw rows / (Consultant, ConsultantActivityRecord) pairs."""
+    if isinstance(source, bytes):
+        # decoded as it is read, and quoted fields keep their line breaks
+        source = io.BytesIO(source)
+    if hasattr(source, 'read'):
+        if isinstance(source.read(0), bytes):
+            source = io.TextIOWrapper(source, encoding='utf-8', newline='')
+        items = DictReader(source)
+    else:
+        items = source
+    return (_snapshot_entry(item) for item in items)
+
+
+def _spilled(chunk):
+    f = tempfile.TemporaryFile()
+    for entry in chunk:
+        pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _read_spilled(f):
+    with f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+_entry_key = itemgetter(0)
+
+
+def sorted_by_contact(entries: Iterable[tuple], chunk_size=50000) -> Iterator[tuple]:
+    """Sorts snapshot entries by contact holding at most `chunk_size` of them in memory: sorted
+    runs are spilled to temporary files and merged back."""
+    entries = iter(entries)
+    first = sorted(islice(entries, chunk_size), key=_entry_key)
+    if len(first) < chunk_size:
+        return iter(first)
+    runs = [_spilled(first)]
+    del first
+    while True:
+        chunk = sorted(islice(entries, chunk_size), key=_entry_key)
+        if not chunk:
+            break
+        runs.append(_spilled(chunk))
+    return heapq.merge(*(_read_spilled(f) for f in runs), key=_entry_key)
+
+
+def diff_team_activity(old, new, volume_threshold=Decimal(0), presorted=False, chunk_size=50000) \
+        -> Iterator[TarChange]:
+    """Compares two TAR snapshots (anything `tar_snapshot` accepts) and yields change events
+    in contact order: NewConsultant, DroppedConsultant, TitleChange, StatusChange and
+    VolumeChange (when QV moved by at least `volume_threshold`).
+
+    The snapshots are joined with a sorted merge on `Contact`. Unless `presorted` is true they
+    are first sorted with `sorted_by_contact`, so memory stays bounded by `chunk_size` rows per
+    snapshot however large the organization is."""
+    old_entries, new_entries = tar_snapshot(old), tar_snapshot(new)
+    if not presorted:
+        old_entries = sorted_by_contact(old_entries, chunk_size)
+        new_entries = sorted_by_contact(new_entries, chunk_size)
+    done = object()
+    o, n = next(old_entries, done), next(new_entries, done)
+    while o is not done or n is not done:
+        if n is done or (o is not done and o[0] < n[0]):
+            yield DroppedConsultant(o[1], o[2], o[3], None)
+            o = next(old_entries, done)
+        elif o is done or n[0] < o[0]:
+            yield NewConsultant(n[1], n[2], None, n[3])
+            n = next(new_entries, done)
+        else:
+            contact, name = n[1], n[2]
+            if o[3] != n[3]:
+                yield TitleChange(contact, name, o[3], n[3])
+            if o[4] != n[4]:
+                yield StatusChange(contact, name, o[4], n[4])
+            if o[5] != n[5] and abs((n[5] or 0) - (o[5] or 0)) >= volume_threshold:
+                yield VolumeChange(contact, name, o[5], n[5])
+            o, n = next(old_entries, done), next(new_entries, done)
@@ -0,0 +1,157 @@
+"""Row filters that are checked against raw API dicts / CSV rows before any parsing.
+
+They are plain classes rather than closures so they can be sent to worker processes
+(see `parsers.parse_team_activity_csv`)."""
+from decimal import Decimal, InvalidOperation
+
+from .util import currency_to_decimal
+
+
+def _one_of(value):
+    """None, a single value, or a collection of accepted values -> frozenset of strings or None."""
+    if value is None:
+        return None
+    if isinstance(value, (str, int)):
+        return frozenset((str(value),))
+    return frozenset(str(v) for v in value)
+
+
+def _decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            number = Decimal(value.strip())
+            return number if number.is_finite() else None
+        except InvalidOperation:
+            pass
+        value = currency_to_decimal(value)  # '$1,234.50', '($5.00)'
+        return value if isinstance(value, Decimal) else None
+    return None
+
+
+def _threshold(value):
+    """A filter's minimum as a Decimal; unlike row values, a threshold that cannot be parsed is
+    an error rather than a silently disabled criterion."""
+    if value is None:
+        return None
+    threshold = _decimal(value)
+    if threshold is None:
+        raise ValueError(f'not a valid amount: {value!r}')
+    return threshold
+
+
+def _meets(value, minimum) -> bool:
+    value = _decimal(value)
+    return value is not None and value >= minimum
+
+
+class OrderFilter:
+    """Accepts raw order history items (`fetch_orders_api`) by status, order type, customer id
+    and minimum QV. Each criterion may be a single value or a collection of values."""
+    __slots__ = (
+        'status',
+        'order_type',
+        'customer_id',
+        'min_qv',
+    )
+
+    def __init__(self, status=None, order_type=None, customer_id=None, min_qv=None):
+        self.status = _one_of(status)
+        self.order_type = _one_of(order_type)
+        self.customer_id = _one_of(customer_id)
+        self.min_qv = _threshold(min_qv)
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+    def __call__(self, item) -> bool:
+        if self.status is not None and (item.get('shippedStatus') or {}).get('description') not in self.status:
+            return False
+        if self.order_type is not None and \
+                (item.get('orderType') or {}).get('orderTypeDescription') not in self.order_type:
+            return False
+        if self.customer_id is not None and str(item.get('userId')) not in self.customer_id:
+            return False
+        if self.min_qv is not None and not _meets(item.get('qv'), self.min_qv):
+            return False
+        return True
+
+
+class CustomerFilter:
+    """Accepts raw customer volume rows (`fetch_customer_volume_json`) by customer id, customer
+    type and minimum sponsor QV."""
+    __slots__ = (
+        'customer_id',
+        'customer_type',
+        'min_qv',
+    )
+
+    def __init__(self, customer_id=None, customer_type=None, min_qv=None):
+        self.customer_id = _one_of(customer_id)
+        self.customer_type = _one_of(customer_type)
+        self.min_qv = _threshold(min_qv)
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+    def __call__(self, row) -> bool:
+        if self.customer_id is not None and str(row.get('userId')) not in self.customer_id:
+            return False
+        if self.customer_type is not None and str(row.get('customerType')) not in self.customer_type:
+            return False
+        if self.min_qv is not None and not _meets(row.get('sponsorQV'), self.min_qv):
+            return False
+        return True
+
+
+class TarRowFilter:
+    """Accepts raw TAR CSV rows by downline level range, status, consultant type and minimum QV."""
+    __slots__ = (
+        'min_level',
+        'max_level',
+        'status',
+        'consultant_type',
+        'min_qv',
+    )
+
+    def __init__(self, min_level=None, max_level=None, status=None, consultant_type=None, min_qv=None):
+        self.min_level = min_level
+        self.max_level = max_level
+        self.status = _one_of(status)
+        self.consultant_type = _one_of(consultant_type)
+        self.min_qv = _threshold(min_qv)
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+    @property
+    def columns(self):
+        """The CSV columns this filter reads."""
+        needed = (
+            ('DLL', self.min_level is not None or self.max_level is not None),
+            ('Status', self.status is not None),
+            ('Type', self.consultant_type is not None),
+            ('QV', self.min_qv is not None),
+        )
+        return tuple(column for column, used in needed if used)
+
+    def __call__(self, row) -> bool:
+        if self.min_level is not None or self.max_level is not None:
+            level = int(row['DLL'])
+            if self.min_level is not None and level < self.min_level:
+                return False
+            if self.max_level is not None and level > self.max_level:
+                return False
+        if self.status is not None and row['Status'] not in self.status:
+            return False
+        if self.consultant_type is not None and row['Type'] not in self.consultant_type:
+            return False
+        if self.min_qv is not None and not _meets(row['QV'], self.min_qv):
+            return False
+        return True
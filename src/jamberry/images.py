@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List
+from urllib.parse import urljoin, urlparse
+
+from .product import Product
+
+DOWNLOADED = 'downloaded'
+DUPLICATE = 'duplicate'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+def _urls_in(value) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value else []
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return [url for v in value for url in _urls_in(v)]
+    return []
+
+
+def product_image_urls(product: Product) -> List[str]:
+    """Every image URL of a product: `img` plus all of its `sized_images`."""
+    urls = _urls_in(getattr(product, 'img', None)) + _urls_in(getattr(product, 'sized_images', None))
+    return list(dict.fromkeys(urls))
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(str(tmp), str(path))
+
+
+class ImageStore:
+    """Content-addressed image mirror.
+
+    Files are stored under `objects/` by the SHA-256 of their content alone, so an image shared
+    by several SKUs, sizes or URL spellings is kept once. `manifest.json` maps each URL to its
+    object, the URL's file extension and Content-Type, and the ETag/Last-Modified it was served
+    with; later syncs send conditional requests and skip images the server reports as unchanged."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.objects = self.directory / 'objects'
+        self.manifest_path = self.directory / 'manifest.json'
+        self.manifest = {}
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+
+    def path(self, url):
+        """Local file for `url`, or None if it has not been downloaded."""
+        entry = self.manifest.get(url)
+        return None if entry is None else self.directory / entry['path']
+
+    def object_path(self, digest) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def save_manifest(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1, sort_keys=True).encode('utf-8'))
+
+    def _fetch(self, session, url, timeout):
+        """Runs in a worker thread; returns (url, response or None, error)."""
+        headers = {}
+        entry = self.manifest.get(url)
+        if entry is not None and (self.directory / entry['path']).exists():
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            resp = session.get(url, headers=headers, timeout=timeout)
+            if resp.status_code != 304:
+                resp.raise_for_status()
+            return url, resp, None
+        except Exception as e:
+            return url, None, e
+
+    def _store(self, url, resp) -> str:
+        if resp.status_code == 304:
+            return UNCHANGED
+        digest = hashlib.sha256(resp.content).hexdigest()
+        path = self.object_path(digest)
+        entry = self.manifest.get(url, {})
+        outcome = DUPLICATE
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, resp.content)
+            outcome = DOWNLOADED
+        elif entry.get('sha256') == digest:
+            outcome = UNCHANGED
+        self.manifest[url] = dict(
+            sha256=digest,
+            path=path.relative_to(self.directory).as_posix(),
+            etag=resp.headers.get('ETag'),
+            last_modified=resp.headers.get('Last-Modified'),
+            content_type=resp.headers.get('Content-Type'),
+            extension=os.path.splitext(urlparse(url).path)[1].lower(),
+        )
+        return outcome
+
+    def sync(self, urls: Iterable[str], session, base_url=None, max_workers=8, timeout=30) -> Counter:
+        """Downloads `urls` concurrently with a requests-like `session` and returns a Counter of
+        outcomes ('downloaded', 'duplicate', 'unchanged', 'failed'). Failed URLs are listed in
+        `self.errors`."""
+        if base_url is not None:
+            urls = (urljoin(base_url, url) for url in urls)
+        urls = list(dict.fromkeys(urls))
+        outcomes = Counter()
+        self.errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, resp, error in executor.map(lambda u: self._fetch(session, u, timeout), urls):
+                if error is not None:
+                    self.errors[url] = error
+                    outcomes[FAILED] += 1
+                else:
+                    outcomes[self._store(url, resp)] += 1
+        self.save_manifest()
+        return outcomes
@@ -0,0 +1,76 @@
+import sys
+from decimal import Decimal
+from typing import Iterable
+
+from .order import Order, OrderLineItem
+from .product import Product
+
+# Order fields whose values repeat across many orders
+ORDER_FIELDS = (
+    'status',
+    'order_type',
+    'customer_id',
+    'customer_name',
+    'customer_contact',
+    'shipping_name',
+    'hostess',
+    'party',
+)
+LINE_ITEM_FIELDS = (
+    'sku',
+    'name',
+    'price',
+)
+
+
+class Interner:
+    """Flyweight pools for loading long order histories into memory.
+
+    Repeated strings (SKUs, product names, statuses, order types, customer names) are replaced
+    with one shared copy, and repeated prices with one shared number. If catalog products are
+    given (e.g. `catalog_products()`), each line item is also linked to its `Product` through
+    `OrderLineItem.product`. Use one Interner for everything that should share objects."""
+
+    def __init__(self, products: Iterable[Product] = ()):
+        self._values = {}
+        self._products = {}
+        self.add_products(products)
+
+    def add_products(self, products: Iterable[Product]):
+        for p in products:
+            sku = p.sku[0] if isinstance(p.sku, list) else p.sku
+            self._products[self.value(sku)] = p
+
+    def product(self, sku):
+        return self._products.get(sku)
+
+    def value(self, value):
+        """The shared copy of a string or number equal to `value`."""
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+            return value
+        # Decimal('1.0') == Decimal('1.00'), but they print differently; keep them apart
+        key = (type(value), str(value) if isinstance(value, Decimal) else value)
+        return self._values.setdefault(key, value)
+
+    # noinspection PyDunderSlots
+    def line_item(self, li: OrderLineItem) -> OrderLineItem:
+        for field in LINE_ITEM_FIELDS:
+            if hasattr(li, field):
+                setattr(li, field, self.value(getattr(li, field)))
+        product = self._products.get(getattr(li, 'sku', None))
+        if product is not None:
+            li.product = product
+        return li
+
+    def order(self, order: Order) -> Order:
+        for field in ORDER_FIELDS:
+            if hasattr(order, field):
+                setattr(order, field, self.value(getattr(order, field)))
+        for li in getattr(order, 'line_items', None) or ():
+            self.line_item(li)
+        return order
+
+    def orders(self, orders: Iterable[Order]) -> Iterable[Order]:
+        return (self.order(o) for o in orders)
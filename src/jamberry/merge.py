@@ -0,0 +1,171 @@
+import re
+from collections import Counter, defaultdict
+from typing import Iterable, List
+
+from .customer import Customer
+
+EXACT = 'exact'
+NAME_AND_ZIP = 'name+zip'
+NAME = 'name'
+ADDRESS = 'address'
+UNMATCHED = 'unmatched'
+
+CONFIDENCE = {
+    EXACT: 1.0,
+    NAME_AND_ZIP: 0.9,
+    NAME: 0.7,
+    ADDRESS: 0.5,
+    UNMATCHED: 0.0,
+}
+
+TIERS = (EXACT, NAME_AND_ZIP, NAME, ADDRESS)
+
+_non_word = re.compile(r'[^a-z0-9 ]+')
+_spaces = re.compile(r'\s+')
+_street_words = {
+    'street': 'st',
+    'avenue': 'ave',
+    'road': 'rd',
+    'drive': 'dr',
+    'lane': 'ln',
+    'court': 'ct',
+    'boulevard': 'blvd',
+    'circle': 'cir',
+    'place': 'pl',
+    'parkway': 'pkwy',
+    'highway': 'hwy',
+    'north': 'n',
+    'south': 's',
+    'east': 'e',
+    'west': 'w',
+    'apartment': 'apt',
+    'suite': 'ste',
+}
+
+
+def _clean(value) -> str:
+    if not value:
+        return ''
+    value = _non_word.sub(' ', str(value).lower())
+    return _spaces.sub(' ', value).strip()
+
+
+def normalize_name(name) -> str:
+    return _clean(name)
+
+
+def normalize_zip(zip_code) -> str:
+    return ''.join(ch for ch in str(zip_code or '') if ch.isdigit())[:5]
+
+
+def normalize_address(line1, zip_code) -> str:
+    words = (_street_words.get(w, w) for w in _clean(line1).split(' ') if w)
+    street = ' '.join(words)
+    if not street:
+        return ''
+    return f'{street}|{normalize_zip(zip_code)}'
+
+
+class CustomerMatch:
+    """One unified customer, with the source records it was built from and how they were paired.
+    `volume` or `angel` is None when that side had no match."""
+    __slots__ = (
+        'customer',
+        'volume',
+        'angel',
+        'method',
+        'confidence',
+    )
+
+    def __init__(self, customer, volume, angel, method):
+        self.customer = customer
+        self.volume = volume
+        self.angel = angel
+        self.method = method
+        self.confidence = CONFIDENCE[method]
+
+
+# noinspection PyDunderSlots
+def combine_customers(primary: Customer, secondary: Customer) -> Customer:
+    """Returns a new Customer with every slot from `primary`, falling back to `secondary` for
+    slots that are unset or empty."""
+    c = Customer()
+    for slot in Customer.__slots__:
+        value = getattr(primary, slot, None)
+        if value in (None, '') and secondary is not None:
+            value = getattr(secondary, slot, value)
+        if value is not None or hasattr(primary, slot) or hasattr(secondary, slot):
+            setattr(c, slot, value)
+    return c
+
+
+def merge_customers(volume_customers: Iterable[Customer],
+                    angel_customers: Iterable[Customer]) -> List[CustomerMatch]:
+    """Joins customers from the volume API (`customer_from_row`) with customers from the
+    Customer Angel CSV (`parse_customer_angel_csv`).
+
+    The Customer Angel records are hashed on normalized name, normalized street/zip, and both.
+    The volume customers are then matched in one pass per tier, from most to least specific, so
+    every exact match is made before any weaker one and the whole join stays linear in the number
+    of customers. Each Customer Angel record is used at most once; one that several volume
+    customers match equally well is left for a later tier. Customer Angel records left over at
+    the end are returned as unmatched."""
+    angel = list(angel_customers)
+    by_full = defaultdict(list)
+    by_name = defaultdict(list)
+    by_name_zip = defaultdict(list)
+    by_address = defaultdict(list)
+    for i, c in enumerate(angel):
+        name = normalize_name(getattr(c, 'name', None))
+        address = normalize_address(getattr(c, 'address_line_1', None), getattr(c, 'address_zip', None))
+        if name:
+            by_name[name].append(i)
+            by_name_zip[name, normalize_zip(getattr(c, 'address_zip', None))].append(i)
+        if address:
+            by_address[address].append(i)
+        if name and address:
+            by_full[name, address].append(i)
+
+    volume = list(volume_customers)
+    lookups = []
+    for v in volume:
+        name = normalize_name(getattr(v, 'name', None))
+        zip_code = normalize_zip(getattr(v, 'address_zip', None))
+        address = normalize_address(getattr(v, 'address_line_1', None), getattr(v, 'address_zip', None))
+        lookups.append((  # candidates per tier, in the order of TIERS
+            by_full.get((name, address), ()),
+            by_name_zip.get((name, zip_code), ()) if zip_code else (),
+            by_name.get(name, ()),
+            by_address.get(address, ()),
+        ))
+
+    claimed = set()
+    matches = [None] * len(volume)
+    for tier, method in enumerate(TIERS):
+        # every volume customer still unmatched proposes its only available candidate; a
+        # candidate proposed by several of them in the same tier is ambiguous and not taken
+        proposals = defaultdict(list)
+        for j, v in enumerate(volume):
+            if matches[j] is not None:
+                continue
+            available = [i for i in lookups[j][tier] if i not in claimed]
+            if len(available) == 1:
+                proposals[available[0]].append(j)
+        for i, proposers in proposals.items():
+            if len(proposers) == 1:
+                j = proposers[0]
+                claimed.add(i)
+                matches[j] = CustomerMatch(combine_customers(volume[j], angel[i]), volume[j], angel[i], method)
+    for j, v in enumerate(volume):
+        if matches[j] is None:
+            matches[j] = CustomerMatch(combine_customers(v, None), v, None, UNMATCHED)
+
+    for i, a in enumerate(angel):
+        if i not in claimed:
+            matches.append(CustomerMatch(combine_customers(a, None), None, a, UNMATCHED))
+    return matches
+
+
+def match_report(matches: Iterable[CustomerMatch]) -> Counter:
+    """Counts matches by method, e.g. Counter({'exact': 412, 'name': 31, 'unmatched': 9})."""
+    return Counter(m.method for m in matches)
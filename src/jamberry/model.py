@@ -0,0 +1,43 @@
+def _restore(cls, state):
+    return cls.from_dict(state)
+
+
+class Model:
+    """Common behaviour for the `__slots__` data classes. Slots may be left unset, so the dict
+    form only contains the slots that have a value. Instances keep identity equality and
+    hashing; compare values with `same_values`."""
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+
+    # noinspection PyDunderSlots
+    @classmethod
+    def from_dict(cls, data):
+        """Builds an instance from `to_dict` output. Keys that are not slots of this class
+        (e.g. written by a newer version of the class) are ignored."""
+        obj = cls.__new__(cls)
+        for name in cls.__slots__:
+            if name in data:
+                setattr(obj, name, data[name])
+        return obj
+
+    def __reduce__(self):
+        return _restore, (self.__class__, self.to_dict())
+
+    def __repr__(self):
+        fields = ', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())
+        return f'{self.__class__.__name__}({fields})'
+
+
+def same_values(a, b) -> bool:
+    """Whether two model objects are of the same class and have the same slot values. Nested
+    model objects (e.g. an order's line items) are compared the same way."""
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(same_values(x, y) for x, y in zip(a, b))
+    if not isinstance(a, Model) or not isinstance(b, Model):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    da, db = a.to_dict(), b.to_dict()
+    return da.keys() == db.keys() and all(same_values(da[k], db[k]) for k in da)
@@ -1,4 +1,7 @@
-class Order:
+from .model import Model
+
+
+class Order(Model):
     __slots__ = (
         'id',
         'order_number',
@@ -24,11 +27,12 @@ class Order:
         'shipping_address',
     )
 
-class OrderLineItem:
+class OrderLineItem(Model):
     __slots__ = (
         'sku',
         'name',
         'price',
         'quantity',
         'total',
+        'product',  # only set when orders are loaded with an Interner that knows the catalog
     )
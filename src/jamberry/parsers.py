@@ -0,0 +1,393 @@
+"""Parsers that turn workstation CSV/JSON/HTML data into model objects.
+
+This module only needs the standard library; `dateutil` is imported the first time a date
+string has to be parsed, and the soup-based parsers work on already-parsed BeautifulSoup
+objects. Worker processes that only parse stored data can import it without pulling in the
+browser stack that `jamberry.workstation` needs."""
+import csv
+import re
+from csv import DictReader
+from datetime import datetime, timedelta
+from functools import lru_cache
+from io import StringIO
+from itertools import islice, zip_longest
+from typing import Iterable, Tuple
+
+from .consultant import Consultant, ConsultantActivityRecord
+from .customer import Customer
+from .order import Order, OrderLineItem
+from .product import Product
+from .util import currency_to_decimal, deprecated
+
+
+def parse_datetime(value) -> datetime:
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
+
+# noinspection PyDunderSlots
+def customer_from_row(row) -> Customer:
+    c = Customer()
+    c.id = row['userId']
+    c.name = row['name']
+    c.address_line_1 = row['address1']
+    c.address_line_2 = row['address2']
+    c.address_city = row['city']
+    c.address_state = row['state']
+    c.address_zip = row['zip']
+    c.address_country = row['country']
+    c.phone = row['phone']
+    c.type = row['customerType']
+
+    first_purchase = row['firstPurchase']
+    try:
+        c.first_purchase_date = parse_datetime(first_purchase)
+    except ValueError:
+        c.first_purchase_date = first_purchase
+
+    last_purchase = row['lastPurchase']
+    try:
+        c.last_purchase_date = parse_datetime(last_purchase)
+    except ValueError:
+        c.last_purchase_date = last_purchase
+
+    c.sponsor_qv = row['sponsorQV']
+    c.sponsor_rv = row['sponsorRV']
+    c.other_qv = row['allQV']
+    c.other_rv = row['allRV']
+    c.original_consultant = row['origConsultant']
+    return c
+
+
+def parse_customer_angel_row(row) -> Customer:
+    c = Customer()
+    c.name = row['nameFirst'] + " " + row['nameLast']
+    c.address_line_1 = row['Address1']
+    c.address_line_2 = row['Address2']
+    c.address_city = row['City']
+    c.address_state = row['State']
+    c.address_zip = row['Zip']
+    c.email = row['Email']
+    c.phone = row['phone']
+    c.birthdate = datetime.strptime(row['birthdate'], '%m/%d/%Y')
+    c.last_purchase_date = parse_datetime(row['trans1'])
+    return c
+
+
+# Team Activity Report columns, in report order, as (API field, CSV column) pairs. The API field
+# names are what the `trans` request parameter uses to select and label columns.
+TAR_COLUMNS = (
+    ('generation', 'GEN'),
+    ('level', 'DLL'),
+    ('contact', 'Contact'),
+    ('firstName', 'First'),
+    ('lastName', 'Last'),
+    ('email', 'Email'),
+    ('phone', 'Phone'),
+    ('address', 'Address'),
+    ('city', 'City'),
+    ('state', 'State'),
+    ('zip', 'ZIP'),
+    ('country', 'Country'),
+    ('conference', 'Attending Conference'),
+    ('start', 'Enrollment'),
+    ('status', 'Status'),
+    ('login', 'Last Login'),
+    ('type', 'Type'),
+    ('title', 'Title'),
+    ('pay', 'Pay Title'),
+    ('prv', 'RV'),
+    ('qv', 'QV'),
+    ('pcv', 'CV'),
+    ('trv', 'TQV'),
+    ('drv', 'DQV'),
+    ('active', 'Active Legs'),
+    ('sponsored', 'Recruits'),
+    ('svip', 'SVIPs'),
+    ('downline', 'Organization Total'),
+    ('tripPts', 'Trip'),
+    ('manager', 'Team Manager'),
+    ('sponsor', 'Sponsor'),
+    ('sponsorEmail', 'Sponsor Email'),
+)
+
+
+def _datetime_or_blank(value):
+    return parse_datetime(value) if len(value) else ''
+
+
+_CONSULTANT, _ACTIVITY = 0, 1
+
+# (CSV column, target object, attribute, converter) for every field parse_team_activity_row sets
+TAR_FIELDS = (
+    ('Contact', _CONSULTANT, 'id', None),
+    ('DLL', _CONSULTANT, 'downline_level', int),
+    ('First', _CONSULTANT, 'first_name', None),
+    ('Last', _CONSULTANT, 'last_name', None),
+    ('Email', _CONSULTANT, 'email', None),
+    ('Phone', _CONSULTANT, 'phone', None),
+    ('Address', _CONSULTANT, 'address_line1', None),
+    ('City', _CONSULTANT, 'address_city', None),
+    ('State', _CONSULTANT, 'address_state', None),
+    ('ZIP', _CONSULTANT, 'address_zip', None),
+    ('Country', _CONSULTANT, 'address_country', None),
+    ('Enrollment', _CONSULTANT, 'start_date', _datetime_or_blank),
+    ('Type', _CONSULTANT, 'consultant_type', None),
+    ('GEN', _ACTIVITY, 'generation', None),
+    ('Attending Conference', _ACTIVITY, 'attending_conference', None),
+    ('Status', _ACTIVITY, 'status', None),
+    ('Last Login', _ACTIVITY, 'last_login', _datetime_or_blank),
+    ('Title', _ACTIVITY, 'title', None),
+    ('Pay Title', _ACTIVITY, 'pay_title', None),
+    ('RV', _ACTIVITY, 'rv', currency_to_decimal),
+    ('QV', _ACTIVITY, 'qv', currency_to_decimal),
+    ('CV', _ACTIVITY, 'cv', currency_to_decimal),
+    ('TQV', _ACTIVITY, 'tqv', currency_to_decimal),
+    ('DQV', _ACTIVITY, 'dqv', currency_to_decimal),
+    ('Active Legs', _ACTIVITY, 'active_legs', None),
+    ('Recruits', _ACTIVITY, 'new_recruits', None),
+    ('SVIPs', _ACTIVITY, 'style_vips', None),
+    ('Organization Total', _ACTIVITY, 'total_downline', None),
+    ('Trip', _ACTIVITY, 'trip_points', None),
+    ('Team Manager', _ACTIVITY, 'team_manager', None),
+    ('Sponsor', _ACTIVITY, 'sponsor_name', None),
+    ('Sponsor Email', _ACTIVITY, 'sponsor_email', None),
+    ('highest', _ACTIVITY, 'highest_title', None),
+)
+
+
+@lru_cache(maxsize=32)
+def tar_fields(columns=None):
+    """The subset of TAR_FIELDS for a tuple of CSV column names (None for all of them)."""
+    if columns is None:
+        return TAR_FIELDS
+    unknown = set(columns) - {field[0] for field in TAR_FIELDS}
+    if unknown:
+        raise ValueError(f'unknown TAR columns: {", ".join(sorted(unknown))}')
+    return tuple(field for field in TAR_FIELDS if field[0] in columns)
+
+
+# noinspection PyDunderSlots
+def parse_team_activity_row(row, columns=None) -> (Consultant, ConsultantActivityRecord):
+    """Given a dict-like row (from TAR CSV export), creates a Consultant object and a
+    ConsultantActivityRecord object. If `columns` (CSV column names, e.g. ('Contact', 'DLL', 'QV'))
+    is given, only those fields are parsed; the other slots are left unset."""
+    c = Consultant()
+    a = ConsultantActivityRecord()
+    a.timestamp = datetime.now()
+    targets = (c, a)
+    for column, target, attribute, convert in tar_fields(None if columns is None else tuple(columns)):
+        value = row[column]
+        setattr(targets[target], attribute, value if convert is None else convert(value))
+    return c, a
+
+
+def _parse_team_activity_records(header, records, columns, row_filter):
+    rows = (dict(zip_longest(header, values)) for values in records)
+    if row_filter is not None:
+        rows = filter(row_filter, rows)
+    return [parse_team_activity_row(row, columns) for row in rows]
+
+
+def parse_team_activity_csv(tar_csv_data, processes=1, chunk_size=1000, columns=None, row_filter=None) \
+        -> Iterable[Tuple[Consultant, ConsultantActivityRecord]]:
+    """Parses TAR CSV export data into (Consultant, ConsultantActivityRecord) pairs, in file order.
+    `columns` restricts parsing to those CSV columns, see `parse_team_activity_row`. Rows for
+    which `row_filter` (e.g. a `filters.TarRowFilter`) is false are skipped before parsing.
+
+    With `processes` other than 1, the rows are split into chunks of `chunk_size` CSV records that
+    are parsed in a process pool (`processes=None` uses one process per CPU); `row_filter` must then
+    be picklable."""
+    if columns is not None:
+        columns = tuple(columns)
+        tar_fields(columns)  # reject unknown columns before doing any work
+    text = StringIO(tar_csv_data.decode(encoding='utf-8'), newline='')
+    if processes == 1:
+        rows = DictReader(text)
+        if row_filter is not None:
+            rows = filter(row_filter, rows)
+        yield from (parse_team_activity_row(row, columns) for row in rows)
+        return
+    from concurrent.futures import ProcessPoolExecutor  # loads multiprocessing, so only when needed
+    # split by CSV record, not by line: quoted fields may contain newlines
+    records = csv.reader(text)
+    header = next(records, None)
+    if header is None:
+        return
+    records = (values for values in records if values)  # DictReader skips blank lines too
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_parse_team_activity_records, header, chunk, columns, row_filter)
+                   for chunk in chunks]
+        for future in futures:
+            yield from future.result()
+
+
+# noinspection PyDunderSlots
+def parse_archive_order_row_soup(row_soup) -> Order:
+    cols = row_soup.findAll('td')
+    o = Order()
+    o.id = cols[0].a.text
+    o.customer_name = cols[1].a.text
+    o.shipping_name = cols[2].a.text
+    o.order_date = datetime.strptime(cols[3].a.text, '%m/%d/%Y') + timedelta(hours=6)
+    o.order_details_url = cols[0].a['href']
+    o.subtotal = currency_to_decimal(cols[4].text)
+    o.shipping_fee = currency_to_decimal(cols[5].text)
+    o.tax = currency_to_decimal(cols[6].text)
+    o.status = cols[9].text.strip()
+    o.retail_bonus = currency_to_decimal(cols[10].text)
+    return o
+
+
+@deprecated('use fetch_orders_api instead')
+def parse_order_row_soup(row_soup) -> Order:
+    o = Order()
+    o.customer_name = row_soup.find(text="Placed By:").next.strip()
+    if o.customer_name == u'':
+        o.customer_name = row_soup.find(text="Placed By:").next.next.next.strip()
+        o.customer_url = 'https://workstation.jamberry.com' + row_soup.findAll(['a'])[2]['href']
+        o.customer_id = o.customer_url.split('/')[-1]
+        try:
+            o.customer_contact = row_soup.find(text="Contact: ").next.strip()
+        except AttributeError:
+            # no contact for this order
+            pass
+    o.id = row_soup.td.a.text
+    o.order_type = row_soup.find(text="Type:").next.strip()
+    o.order_date = datetime.strptime(row_soup.td.nextSibling.a.text, '%b %d, %Y') + timedelta(hours=6)
+    o.order_details_url = row_soup.td.a['href']
+    o.shipping_name = row_soup.find(text="Shipped To:").next.strip()
+    o.subtotal = row_soup.find(text="Subtotal:").next.strip()
+    o.shipping_fee = row_soup.find(text="Shipping:").next.strip()
+    o.tax = row_soup.find(text="Tax:").next.strip()
+    o.total = row_soup.find(text="Total:").next.strip()
+    o.qv = row_soup.find(text="QV:").next.strip()
+    o.status = row_soup.find(text="Status: ").next.strip()
+    row_find = row_soup.find(text=re.compile('Hostess:'))
+    if row_find:
+        o.hostess = row_find.next.strip()
+    row_find = row_soup.find(text=re.compile('Party:'))
+    if row_find:
+        o.party = row_find.next.strip()
+    row_find = row_soup.find(text='Shipped On:')
+    if row_find:
+        ship_date_str = row_find.next.strip()
+        o.ship_date = datetime.strptime(ship_date_str, '%m/%d/%Y')
+    return o
+
+
+def extract_line_items(detail_soup) -> Iterable[OrderLineItem]:
+    line_items_table = detail_soup.find(id='ctl00_main_dgMain')
+    line_items_rows = line_items_table.findAll('tr')[1:]  # skip header row
+    line_items = []
+    for row in line_items_rows:
+        cells = row.findAll('td')
+
+        line_item = OrderLineItem()
+        line_item.sku = cells[0].text.strip()
+        line_item.name = cells[1].text.strip()
+        line_item.price = cells[2].text.strip()
+        line_item.quantity = int(cells[3].text.strip())
+        line_item.total = currency_to_decimal(cells[4].text.strip().split('\n')[0])
+
+        line_items.append(line_item)
+    return line_items
+
+
+def extract_shipping_address(detail_soup) -> str:
+    iter_address_lines = detail_soup.find(text=re.compile('Address')).findNext('dd').stripped_strings
+    shipping_address = '\n'.join(iter_address_lines)
+    return shipping_address
+
+
+# noinspection PyDunderSlots
+def parse_customer_angel_csv(customers_angel_csv_data):
+    customer_rows = DictReader(customers_angel_csv_data.decode(encoding='utf-8').splitlines())
+    yield from (parse_customer_angel_row(row) for row in customer_rows)
+
+
+def parse_product(row) -> Product:
+    p = Product()
+    p.img = row['img']
+    p.sku = row['sku']
+    p.in_stock = row['inStock']
+    p.price = row['price']
+    p.retail_price = row['priceRetailFull']
+    p.slug = row['slug']
+    p.tags = row['tags']
+    p.title = row['title']
+    p.nas_design = row['nasDesign']
+    p.product_type = row['productType']
+    p.sized_images = row['sizedImages']
+    p.on_sale = row['isOnSale']
+    return p
+
+
+def parse_placed_order_api(item):
+    order = Order()
+    order.id = item['id']
+    order.order_number = item['orderNum']
+    order.customer_id = item['address']['id']
+    order.customer_name = item['address']['name']
+    # order.hostess = item['party']['hostName'] if item['party'] else None
+    # order.party = item['party']['name'] if item['party'] else None
+    order.order_date = datetime.fromtimestamp(item['createdTime'] / 1000)
+    order.status = item['state']
+    # order.ship_date = item.get('shippedDate', None)
+    order.qv = item['qv']
+    # order.retail_bonus = item['']
+    order.total = item['total']
+    order.shipping_fee = item['shipping']
+    order.tax = item['tax']
+    # order.order_type = item['orderType']['orderTypeDescription']
+    order.shipping_name = item['shippingAddress']['name']
+    order.shipping_address = item['shippingAddress']
+    order.subtotal = item['subtotal']
+    # order.customer_contact = item['orderedEmail']
+    order.line_items = []
+    for osi in item['items']:
+        li = OrderLineItem()
+        li.name = osi['description']
+        li.total = osi['total']
+        li.price = osi['price']
+        li.quantity = osi['quantity']
+        li.sku = osi['sku']
+        order.line_items.append(li)
+    return order
+
+
+def parse_order_api(item):
+    order = Order()
+    order.id = item['orderID']
+    order.order_number = item['orderReferenceNum']
+    order.customer_id = item['userId']
+    order.customer_name = '{orderedFirstName} {orderedLastName}'.format(**item)
+    order.hostess = item['party']['hostName'] if item['party'] else None
+    order.party = item['party']['name'] if item['party'] else None
+    order.order_date = datetime.strptime(item['orderedDate'], '%Y-%m-%dT%H:%M:%S')
+    order.status = item['shippedStatus']['description']
+    order.ship_date = item.get('shippedDate', None)
+    order.qv = item['qv']
+    #order.retail_bonus = item['']
+    order.total = item['orderTotal']
+    order.shipping_fee = item['shippingTotal']
+    order.tax = item['taxTotal']
+    order.order_type = item['orderType']['orderTypeDescription']
+    order.shipping_name = f"{item['shippingFirstName']} {item['shippingLastName']}"
+    order.shipping_address = f"{order.shipping_name}\n" \
+                             f"{item['shippingAddress1']}\n" \
+                             f"{item['shippingAddress2']}\n" \
+                             f"{item['shippingCity']}, {item['shippingState']} {item['shippingPostalCode']}"
+    order.subtotal = item['subTotal']
+    order.customer_contact = item['orderedEmail']
+    order.line_items = []
+    for osi in item['orderStatusItems']:
+        li = OrderLineItem()
+        li.name = osi['name']
+        li.total = osi['priceTotal']
+        li.price = osi['pricePer']
+        li.quantity = osi['quantity']
+        li.sku = osi['sku']
+        order.line_items.append(li)
+    return order
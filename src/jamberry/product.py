@@ -1,4 +1,7 @@
-class Product:
+from .model import Model
+
+
+class Product(Model):
     __slots__ = (
         'tags',
         'sku',
@@ -0,0 +1,152 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, List
+
+from .product import Product
+
+_token = re.compile(r'[a-z0-9]+')
+
+# How much a query term matching each field counts towards a product's score
+FIELD_WEIGHTS = (
+    ('sku', 4.0),
+    ('title', 3.0),
+    ('nas_design', 2.0),
+    ('product_type', 1.5),
+    ('tags', 1.0),
+)
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.4
+
+
+def tokenize(text) -> List[str]:
+    return _token.findall(text.lower())
+
+
+def _field_texts(value) -> List[str]:
+    """Field values may be a string, a list of strings (tags, some SKUs) or something else
+    entirely (e.g. a boolean); only the strings are indexed."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+def _deletes(token) -> List[str]:
+    return [token[:i] + token[i + 1:] for i in range(len(token))]
+
+
+def _within_one_edit(a, b) -> bool:
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+class ProductIndex:
+    """In-memory inverted index over catalog products for local, as-you-type lookups.
+
+    Titles, tags, SKUs, product types and NAS designs are tokenized into a term -> product
+    postings map. A query term matches terms it equals or is a prefix of (found by bisecting the
+    sorted vocabulary), and, failing that, terms within one edit of it (found through a
+    single-deletion neighbourhood index). Every query term has to match for a product to be
+    returned."""
+
+    min_fuzzy_length = 4
+
+    def __init__(self, products: Iterable[Product] = ()):
+        self._products = []
+        self._by_sku = {}
+        self._postings = defaultdict(dict)  # term -> {product number: weight}
+        self._deletion_index = defaultdict(set)  # term with one letter removed -> terms
+        self._vocabulary = None
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self._by_sku)
+
+    def add(self, product: Product):
+        """Indexes `product`, replacing any product previously indexed with the same SKU."""
+        sku = self._sku(product)
+        if sku in self._by_sku:
+            self._products[self._by_sku[sku]] = None
+        number = len(self._products)
+        self._products.append(product)
+        if sku is not None:
+            self._by_sku[sku] = number
+        for field, weight in FIELD_WEIGHTS:
+            for text in _field_texts(getattr(product, field, None)):
+                for term in tokenize(text):
+                    postings = self._postings[term]
+                    postings[number] = max(postings.get(number, 0), weight)
+                    if len(term) >= self.min_fuzzy_length:
+                        for deleted in _deletes(term):
+                            self._deletion_index[deleted].add(term)
+        self._vocabulary = None
+
+    def get(self, sku):
+        number = self._by_sku.get(sku)
+        return None if number is None else self._products[number]
+
+    @staticmethod
+    def _sku(product):
+        sku = getattr(product, 'sku', None)
+        if isinstance(sku, (list, tuple)):
+            sku = sku[0] if sku else None
+        return sku
+
+    def _sorted_vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _matching_terms(self, query_term, fuzzy):
+        """(term, match quality) pairs for one query term."""
+        vocabulary = self._sorted_vocabulary()
+        matches = []
+        i = bisect_left(vocabulary, query_term)
+        while i < len(vocabulary) and vocabulary[i].startswith(query_term):
+            term = vocabulary[i]
+            matches.append((term, EXACT if term == query_term else PREFIX))
+            i += 1
+        if matches or not fuzzy or len(query_term) < self.min_fuzzy_length:
+            return matches
+        candidates = set(self._deletion_index.get(query_term, ()))
+        for deleted in _deletes(query_term):
+            if deleted in self._postings:
+                candidates.add(deleted)
+            candidates.update(self._deletion_index.get(deleted, ()))
+        return [(term, FUZZY) for term in candidates if _within_one_edit(query_term, term)]
+
+    def search(self, query, limit=10, fuzzy=True) -> List[Product]:
+        """Products matching every term of `query`, best matches first."""
+        scores = None
+        for query_term in tokenize(query):
+            term_scores = {}
+            for term, quality in self._matching_terms(query_term, fuzzy):
+                for number, weight in self._postings[term].items():
+                    score = quality * weight
+                    if score > term_scores.get(number, 0):
+                        term_scores[number] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {n: s + term_scores[n] for n, s in scores.items() if n in term_scores}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        ranked = sorted(
+            (n for n in scores if self._products[n] is not None),
+            key=lambda n: (-scores[n], n),
+        )
+        return [self._products[n] for n in ranked[:limit]]
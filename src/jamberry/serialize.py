@@ -0,0 +1,103 @@
+import json
+import pickle
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List
+
+from .consultant import Consultant, ConsultantActivityRecord
+from .customer import Customer
+from .model import Model
+from .order import Order, OrderLineItem
+from .product import Product
+
+SCHEMA_VERSION = 1
+BINARY_MAGIC = b'JAMB'
+
+MODELS = {cls.__name__: cls for cls in (
+    Consultant,
+    ConsultantActivityRecord,
+    Customer,
+    Order,
+    OrderLineItem,
+    Product,
+)}
+
+
+def encode_value(value):
+    """Converts models, Decimals and datetimes (also inside lists and dicts) into plain JSON types."""
+    if isinstance(value, Model):
+        fields = {k: encode_value(v) for k, v in value.to_dict().items()}
+        return {'__model__': value.__class__.__name__, 'fields': fields}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    return value
+
+
+def _decode_object(d):
+    if '__model__' in d:
+        return MODELS[d['__model__']].from_dict(d['fields'])
+    if '__decimal__' in d:
+        return Decimal(d['__decimal__'])
+    if '__datetime__' in d:
+        return datetime.fromisoformat(d['__datetime__'])
+    if '__date__' in d:
+        return date.fromisoformat(d['__date__'])
+    return d
+
+
+def _check_version(version):
+    if version > SCHEMA_VERSION:
+        raise ValueError(f'data written with schema version {version}, '
+                         f'this version of jamberry reads up to {SCHEMA_VERSION}')
+
+
+def to_json(obj) -> str:
+    """Serializes a model object, or a list of them, to a JSON string."""
+    return json.dumps({'version': SCHEMA_VERSION, 'data': encode_value(obj)}, separators=(',', ':'))
+
+
+def from_json(s):
+    document = json.loads(s, object_hook=_decode_object)
+    _check_version(document['version'])
+    return document['data']
+
+
+def dump_json_lines(objs: Iterable[Model], f):
+    """Writes one JSON document per line to text file `f`, after a header line carrying the
+    schema version. Suited to streaming very large batches."""
+    f.write(json.dumps({'version': SCHEMA_VERSION}))
+    f.write('\n')
+    for obj in objs:
+        f.write(json.dumps(encode_value(obj), separators=(',', ':')))
+        f.write('\n')
+
+
+def load_json_lines(f) -> Iterable[Model]:
+    header = json.loads(next(iter(f)))
+    _check_version(header['version'])
+    for line in f:
+        if line.strip():
+            yield json.loads(line, object_hook=_decode_object)
+
+
+def dumps(objs: Iterable[Model]) -> bytes:
+    """Compact binary encoding of a batch of model objects. Models pickle as the dict of
+    their set slots, so decoding tolerates slots added or removed since the data was written."""
+    return BINARY_MAGIC + pickle.dumps((SCHEMA_VERSION, list(objs)), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data: bytes) -> List[Model]:
+    """Decodes `dumps` output. Like pickle, only use this on data from a trusted source."""
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError('not a jamberry binary batch')
+    version, objs = pickle.loads(data[len(BINARY_MAGIC):])
+    _check_version(version)
+    return objs
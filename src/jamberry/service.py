@@ -0,0 +1,177 @@
+"""A local read-through cache in front of one JamberryWorkstation.
+
+Run it with `python -m jamberry.service` (credentials come from `jamberry.ini`) and point any
+number of local processes at it with `WorkstationClient`. The service owns the logged-in
+session, caches `fetch_*` results for `ttl` seconds, and collapses identical requests that
+arrive while one is already in flight into a single upstream call."""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+from urllib.request import urlopen
+
+# fetch_* methods the service will run; generators are turned into lists
+SERVED_METHODS = (
+    'fetch_team_activity_csv',
+    'fetch_customer_volume_json',
+    'fetch_customer_angel_csv',
+    'fetch_orders_api',
+    'fetch_order',
+    'fetch_order_detail_api',
+    'fetch_order_tracking',
+    'fetch_all_products',
+)
+
+
+class SingleFlightCache:
+    """Thread-safe TTL cache where concurrent misses for the same key share one load. Expired
+    entries are dropped whenever a value is stored, and at most `max_entries` are kept (the
+    ones closest to expiring go first)."""
+
+    def __init__(self, ttl=60, clock=time.monotonic, max_entries=128):
+        self.ttl = ttl
+        self.clock = clock
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._values = {}  # key -> (expires at, value)
+        self._in_flight = {}  # key -> Future
+
+    def get(self, key, loader):
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] > self.clock():
+                return cached[1]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._evict()
+            self._values[key] = (self.clock() + self.ttl, value)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def _evict(self):
+        now = self.clock()
+        for key in [key for key, (expires, _) in self._values.items() if expires <= now]:
+            del self._values[key]
+        while self._values and len(self._values) >= self.max_entries:
+            del self._values[min(self._values, key=lambda k: self._values[k][0])]
+
+    def __len__(self):
+        return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class WorkstationService:
+    def __init__(self, ws, ttl=60):
+        self.ws = ws
+        self.cache = SingleFlightCache(ttl)
+        self._upstream_lock = threading.Lock()  # one workstation session, one request at a time
+        self.upstream_calls = 0
+
+    def call(self, name, kwargs=None):
+        if name not in SERVED_METHODS:
+            raise KeyError(name)
+        kwargs = kwargs or {}
+        key = (name, json.dumps(kwargs, sort_keys=True))
+        return self.cache.get(key, lambda: self._upstream(name, kwargs))
+
+    def _upstream(self, name, kwargs):
+        with self._upstream_lock:
+            self.upstream_calls += 1
+            result = getattr(self.ws, name)(**kwargs)
+            if not isinstance(result, (bytes, dict, list, str)) and hasattr(result, '__iter__'):
+                result = list(result)
+            return result
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'fetch':
+            return self.send_error(404)
+        if parts[1] not in SERVED_METHODS:
+            return self.send_error(404, f'unknown method {parts[1]}')
+        query = parse_qs(url.query)
+        try:
+            kwargs = json.loads(query['args'][0]) if 'args' in query else {}
+        except ValueError:
+            return self.send_error(400, 'args must be JSON')
+        if not isinstance(kwargs, dict):
+            return self.send_error(400, 'args must be a JSON object')
+        try:
+            result = self.service.call(parts[1], kwargs)
+        except Exception as e:
+            return self.send_error(502, f'{type(e).__name__}: {e}')
+        if isinstance(result, bytes):
+            body, content_type = result, 'application/octet-stream'
+        else:
+            body, content_type = json.dumps(result).encode('utf-8'), 'application/json'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(ws, host='127.0.0.1', port=8765, ttl=60) -> ThreadingHTTPServer:
+    handler = type('Handler', (_Handler,), dict(service=WorkstationService(ws, ttl)))
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class WorkstationClient:
+    """Calls the served `fetch_*` methods over HTTP, e.g.
+    `WorkstationClient().fetch_team_activity_csv(year=2018, month=3)`."""
+
+    def __init__(self, url='http://127.0.0.1:8765', timeout=300):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch(self, name, **kwargs):
+        url = f'{self.url}/fetch/{name}'
+        if kwargs:
+            url += '?args=' + quote(json.dumps(kwargs))
+        with urlopen(url, timeout=self.timeout) as resp:
+            body = resp.read()
+            if resp.headers.get('Content-Type') == 'application/json':
+                return json.loads(body)
+            return body
+
+    def __getattr__(self, name):
+        if name not in SERVED_METHODS:
+            raise AttributeError(name)
+        return lambda **kwargs: self.fetch(name, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve cached workstation data to local clients.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ttl', type=int, default=60, help='seconds to cache each result')
+    args = parser.parse_args()
+
+    from .workstation import JamberryWorkstation
+    make_server(JamberryWorkstation(), args.host, args.port, args.ttl).serve_forever()
@@ -0,0 +1,150 @@
+import json
+import re
+import time
+
+TERMINAL_STATES = (
+    'delivered',
+    'returned',
+    'cancelled',
+    'canceled',
+    'refunded',
+)
+
+
+# an address 'state' is not a shipment state
+ADDRESS_STATE_KEYS = ('state', 'shippingstate', 'billingstate', 'shipstate')
+NEGATIONS = ('not', 'no', 'never')
+
+
+def _is_status_key(key) -> bool:
+    return key.endswith('status')
+
+
+def _is_state_key(key) -> bool:
+    return key.endswith('state') and key not in ADDRESS_STATE_KEYS
+
+
+def _find_status(result, matches):
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, str) and matches(key.lower()):
+                return value
+        children = (value for key, value in result.items() if 'address' not in key.lower())
+    elif isinstance(result, list):
+        children = result
+    else:
+        return None
+    for child in children:
+        status = _find_status(child, matches)
+        if status is not None:
+            return status
+    return None
+
+
+def tracking_status(result):
+    """Finds the shipment status in a tracking API result. The shipment tracking response is
+    not documented, so this looks for a `status` or `*Status` key anywhere in it, and failing
+    that a `*State` key that is not part of an address."""
+    status = _find_status(result, _is_status_key)
+    if status is None:
+        status = _find_status(result, _is_state_key)
+    return status
+
+
+def is_terminal(result) -> bool:
+    """Whether the status says the shipment is done: one of its words is a terminal state and
+    it is not negated ('Delivered', but not 'Undelivered' or 'Not Delivered')."""
+    status = tracking_status(result)
+    if not status:
+        return False
+    words = re.findall(r'[a-z]+', status.lower())
+    if any(word in NEGATIONS for word in words):
+        return False
+    return any(word in TERMINAL_STATES for word in words)
+
+
+class TrackingEntry:
+    __slots__ = (
+        'order_id',
+        'result',
+        'status',
+        'fetched_at',
+        'unchanged_polls',
+        'terminal',
+    )
+
+    def __init__(self, order_id, result, status, fetched_at, unchanged_polls=0, terminal=False):
+        self.order_id = order_id
+        self.result = result
+        self.status = status
+        self.fetched_at = fetched_at
+        self.unchanged_polls = unchanged_polls
+        self.terminal = terminal
+
+
+class TrackingCache:
+    """Remembers tracking results between polls.
+
+    Orders in a terminal state (see `TERMINAL_STATES`) are never fetched again. Other orders
+    become due `base_interval` seconds after their last fetch; every poll that comes back with
+    an unchanged status doubles the wait, up to `max_interval`."""
+
+    def __init__(self, base_interval=15 * 60, max_interval=6 * 60 * 60, clock=time.time):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.entries = {}
+        self.errors = {}  # order id -> exception, from the last fetch_order_tracking_batch
+
+    def __contains__(self, order_id):
+        return str(order_id) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, order_id):
+        entry = self.entries.get(str(order_id))
+        return entry.result if entry is not None else None
+
+    def next_poll(self, order_id):
+        """Timestamp when `order_id` should next be fetched; None if it never needs to be, and
+        -inf (always due) if it has not been fetched yet."""
+        entry = self.entries.get(str(order_id))
+        if entry is None:
+            return float('-inf')
+        if entry.terminal:
+            return None
+        interval = min(self.base_interval * 2 ** entry.unchanged_polls, self.max_interval)
+        return entry.fetched_at + interval
+
+    def is_due(self, order_id, now=None) -> bool:
+        next_poll = self.next_poll(order_id)
+        if next_poll is None:
+            return False
+        if now is None:
+            now = self.clock()
+        return next_poll <= now
+
+    def update(self, order_id, result):
+        key = str(order_id)
+        status = tracking_status(result)
+        previous = self.entries.get(key)
+        unchanged_polls = 0
+        if previous is not None and previous.status == status:
+            unchanged_polls = previous.unchanged_polls + 1
+        self.entries[key] = TrackingEntry(key, result, status, self.clock(), unchanged_polls, is_terminal(result))
+
+    def save(self, path):
+        data = {
+            key: [e.result, e.status, e.fetched_at, e.unchanged_polls, e.terminal]
+            for key, e in self.entries.items()
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    def load(self, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        for key, (result, status, fetched_at, unchanged_polls, terminal) in data.items():
+            self.entries[key] = TrackingEntry(key, result, status, fetched_at, unchanged_polls, terminal)
+        return self
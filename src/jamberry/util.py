@@ -1,4 +1,5 @@
 import re
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 import functools
 import inspect
@@ -25,6 +26,31 @@ def currency_to_decimal(param):
     return param
 
 
+def to_date(value) -> date:
+    """Accepts a date, datetime or 'YYYY-MM-DD' string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def date_shards(start_date, end_date, months=1):
+    """Splits the inclusive range [start_date, end_date] into consecutive inclusive
+    ('YYYY-MM-DD', 'YYYY-MM-DD') ranges aligned to calendar blocks of `months` months
+    (1 for months, 3 for quarters)."""
+    start, end = to_date(start_date), to_date(end_date)
+    shards = []
+    while start <= end:
+        month_index = start.year * 12 + start.month - 1
+        next_index = (month_index // months + 1) * months
+        next_start = date(next_index // 12, next_index % 12 + 1, 1)
+        shard_end = min(next_start - timedelta(days=1), end)
+        shards.append((start.isoformat(), shard_end.isoformat()))
+        start = next_start
+    return shards
+
+
 def deprecated(reason):
     """
     This is a decorator which can be used to mark functions
@@ -1,28 +1,86 @@
 import json
 import re
+import time
 from abc import abstractmethod, ABC
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from csv import DictReader
-from datetime import datetime, timedelta
-from functools import wraps
+from datetime import datetime
+from functools import partial, wraps
+from io import StringIO
 from itertools import chain
 from typing import Iterable, Tuple
 from urllib.parse import urljoin
 
-import dateutil.parser
 import mechanicalsoup
+import requests
 
+from .batching import Batch, batched, page_entries, resume_position
+from .cart import SearchCartStore
+from .concurrency import AdaptiveLimiter
 from .consultant import Consultant, ConsultantActivityRecord
 from .customer import Customer
-from .order import Order, OrderLineItem
+from .deadline import DeadlineExceeded, bind_current, bounded, current_deadline
+from .filters import CustomerFilter, OrderFilter, TarRowFilter
+from .images import ImageStore, product_image_urls
+from .interning import Interner
+from .merge import merge_customers, CustomerMatch
+from .order import Order
+from .parsers import (
+    customer_from_row,
+    extract_line_items,
+    extract_shipping_address,
+    parse_archive_order_row_soup,
+    parse_customer_angel_csv,
+    parse_customer_angel_row,
+    parse_order_api,
+    parse_order_row_soup,
+    parse_placed_order_api,
+    parse_product,
+    parse_team_activity_csv,
+    parse_team_activity_row,
+    TAR_COLUMNS,
+    TAR_FIELDS,
+)
 from .product import Product
-from .util import currency_to_decimal, deprecated
+from .search import ProductIndex
+from .tracking import TrackingCache
+from .util import date_shards, deprecated
 
 
 def field_data(soup, name) -> (str, str):
     return name, soup.find('input', attrs=dict(name=name)).get('value')
 
 
+TAR_RANK_TRANSLATIONS = 'CompRank_AdvancedConsultant|Advanced Consultant,CompRank_Consultant|Consultant,CompRank_SeniorConsultant|Senior Consultant,CompRank_LeadConsultant|Lead Consultant,CompRank_TeamManager|Team Manager,CompRank_SeniorTeamManager|Senior Team Manager,CompRank_PremierConsultant|Premier Consultant,CompRank_SeniorLeadConsultant|Senior Lead Consultant,CompRank_Executive|Executive,CompRank_SeniorExecutive|Senior Executive,CompRank_LeadExecutive|Lead Executive,CompRank_EliteExecutive|Elite Executive,ProfessionalConsultant|Professional Consultant,Hobbyist|Hobbyist,FastStart|Fast Start,Active|Active,In Progress|In Progress'
+
+
+def tar_trans_param(columns=None) -> str:
+    """Builds the TAR `trans` parameter, which picks and labels the report columns."""
+    if columns is None:
+        selected = TAR_COLUMNS
+    else:
+        unknown = set(columns) - {header for _, header in TAR_COLUMNS} - {field[0] for field in TAR_FIELDS}
+        if unknown:
+            raise ValueError(f'unknown TAR columns: {", ".join(sorted(unknown))}')
+        selected = [(field, header) for field, header in TAR_COLUMNS if header in columns]
+    return ','.join([TAR_RANK_TRANSLATIONS] + [f'{field}|{header}' for field, header in selected])
+
+
+# Downline level ranges for sharded TAR downloads; the last range is open-ended
+DEFAULT_TAR_LEVEL_SHARDS = ((1, 1), (2, 2), (3, 3), (4, 5), (6, 8), (9, 9999))
+
+
+def tar_level_shards(min_level, max_level, level_shards=DEFAULT_TAR_LEVEL_SHARDS):
+    """The (first, last) level ranges of `level_shards` clipped to [min_level, max_level]."""
+    shards = []
+    for first, last in level_shards:
+        first, last = max(first, min_level), min(last, max_level)
+        if first <= last:
+            shards.append((first, last))
+    return shards
+
+
 def requires_login(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -33,188 +91,96 @@ def requires_login(f):
     return wrapper
 
 
-# noinspection PyDunderSlots
-def customer_from_row(row) -> Customer:
-    c = Customer()
-    c.id = row['userId']
-    c.name = row['name']
-    c.address_line_1 = row['address1']
-    c.address_line_2 = row['address2']
-    c.address_city = row['city']
-    c.address_state = row['state']
-    c.address_zip = row['zip']
-    c.address_country = row['country']
-    c.phone = row['phone']
-    c.type = row['customerType']
-
-    first_purchase = row['firstPurchase']
-    try:
-        c.first_purchase_date = dateutil.parser.parse(first_purchase)
-    except ValueError:
-        c.first_purchase_date = first_purchase
+DEADLINE_CHUNK_SIZE = 64 * 1024
 
-    last_purchase = row['lastPurchase']
+
+def _read_before(resp, deadline):
+    """Reads a streamed response body, giving up when `deadline` passes between chunks."""
+    chunks = []
     try:
-        c.last_purchase_date = dateutil.parser.parse(last_purchase)
-    except ValueError:
-        c.last_purchase_date = last_purchase
-
-    c.sponsor_qv = row['sponsorQV']
-    c.sponsor_rv = row['sponsorRV']
-    c.other_qv = row['allQV']
-    c.other_rv = row['allRV']
-    c.original_consultant = row['origConsultant']
-    return c
-
-
-def parse_customer_angel_row(row) -> Customer:
-    c = Customer()
-    c.name = row['nameFirst'] + " " + row['nameLast']
-    c.address_line_1 = row['Address1']
-    c.address_line_2 = row['Address2']
-    c.address_city = row['City']
-    c.address_state = row['State']
-    c.address_zip = row['Zip']
-    c.email = row['Email']
-    c.phone = row['phone']
-    c.birthdate = datetime.strptime(row['birthdate'], '%m/%d/%Y')
-    c.last_purchase_date = dateutil.parser.parse(row['trans1'])
-    return c
-
-
-# noinspection PyDunderSlots
-def parse_team_activity_row(row) -> (Consultant, ConsultantActivityRecord):
-    """Given a dict-like row (from TAR CSV export), creates a Consultant object and a
-    ConsultantActivityRecord object."""
-    c = Consultant()
-    c.id = row['Contact']
-    c.downline_level = int(row['DLL'])
-    c.first_name = row['First']
-    c.last_name = row['Last']
-    c.email = row['Email']
-    c.phone = row['Phone']
-    c.address_line1 = row['Address']
-    c.address_city = row['City']
-    c.address_state = row['State']
-    c.address_zip = row['ZIP']
-    c.address_country = row['Country']
-    c.start_date = dateutil.parser.parse(row['Enrollment']) if len(row['Enrollment']) else ''
-    c.consultant_type = row['Type']
-
-    a = ConsultantActivityRecord()
-    a.timestamp = datetime.now()
-    a.generation = row['GEN']
-    a.attending_conference = row['Attending Conference']
-    a.status = row['Status']
-    a.last_login = dateutil.parser.parse(row['Last Login']) if len(row['Last Login']) else ''
-    a.title = row['Title']
-    a.pay_title = row['Pay Title']
-    a.rv = currency_to_decimal(row['RV'])
-    a.qv = currency_to_decimal(row['QV'])
-    a.cv = currency_to_decimal(row['CV'])
-    a.tqv = currency_to_decimal(row['TQV'])
-    a.dqv = currency_to_decimal(row['DQV'])
-    a.active_legs = row['Active Legs']
-    a.new_recruits = row['Recruits']
-    a.style_vips = row['SVIPs']
-    a.total_downline = row['Organization Total']
-    a.trip_points = row['Trip']
-    a.team_manager = row['Team Manager']
-    a.sponsor_name = row['Sponsor']
-    a.sponsor_email = row['Sponsor Email']
-    a.highest_title = row['highest']
-
-    return c, a
-
-
-# noinspection PyDunderSlots
-def parse_archive_order_row_soup(row_soup) -> Order:
-    cols = row_soup.findAll('td')
-    o = Order()
-    o.id = cols[0].a.text
-    o.customer_name = cols[1].a.text
-    o.shipping_name = cols[2].a.text
-    o.order_date = datetime.strptime(cols[3].a.text, '%m/%d/%Y') + timedelta(hours=6)
-    o.order_details_url = cols[0].a['href']
-    o.subtotal = currency_to_decimal(cols[4].text)
-    o.shipping_fee = currency_to_decimal(cols[5].text)
-    o.tax = currency_to_decimal(cols[6].text)
-    o.status = cols[9].text.strip()
-    o.retail_bonus = currency_to_decimal(cols[10].text)
-    return o
-
-
-@deprecated('use fetch_orders_api instead')
-def parse_order_row_soup(row_soup) -> Order:
-    o = Order()
-    o.customer_name = row_soup.find(text="Placed By:").next.strip()
-    if o.customer_name == u'':
-        o.customer_name = row_soup.find(text="Placed By:").next.next.next.strip()
-        o.customer_url = 'https://workstation.jamberry.com' + row_soup.findAll(['a'])[2]['href']
-        o.customer_id = o.customer_url.split('/')[-1]
+        for chunk in resp.iter_content(DEADLINE_CHUNK_SIZE):
+            chunks.append(chunk)
+            if deadline.expired:
+                raise DeadlineExceeded
+    except requests.exceptions.RequestException:
+        if deadline.expired:
+            raise DeadlineExceeded
+        raise
+    finally:
+        resp.close()
+    resp._content = b''.join(chunks)
+    return resp
+
+
+def _sleep_before_deadline(seconds):
+    """Sleeps for `seconds`, but no longer than the active deadline allows."""
+    deadline = current_deadline()
+    if deadline is not None:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded
+        seconds = min(seconds, remaining)
+    time.sleep(seconds)
+
+
+def deadline_bounded(request):
+    """Wraps `Session.request` so requests made while a Deadline is active time out when it
+    expires (and are not started once it has). The timeout only bounds each connect and read,
+    so the body is streamed and the deadline is also checked between chunks: a slowly trickling
+    download stops when time runs out, too."""
+    @wraps(request)
+    def wrapper(method, url, **kwargs):
+        deadline = current_deadline()
+        if deadline is None:
+            return request(method, url, **kwargs)
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded
+        timeout = kwargs.get('timeout')
+        if isinstance(timeout, tuple):
+            kwargs['timeout'] = tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        elif timeout is None or timeout > remaining:
+            kwargs['timeout'] = remaining
+        read_body = not kwargs.get('stream')
+        kwargs['stream'] = True
         try:
-            o.customer_contact = row_soup.find(text="Contact: ").next.strip()
-        except AttributeError:
-            # no contact for this order
-            pass
-    o.id = row_soup.td.a.text
-    o.order_type = row_soup.find(text="Type:").next.strip()
-    o.order_date = datetime.strptime(row_soup.td.nextSibling.a.text, '%b %d, %Y') + timedelta(hours=6)
-    o.order_details_url = row_soup.td.a['href']
-    o.shipping_name = row_soup.find(text="Shipped To:").next.strip()
-    o.subtotal = row_soup.find(text="Subtotal:").next.strip()
-    o.shipping_fee = row_soup.find(text="Shipping:").next.strip()
-    o.tax = row_soup.find(text="Tax:").next.strip()
-    o.total = row_soup.find(text="Total:").next.strip()
-    o.qv = row_soup.find(text="QV:").next.strip()
-    o.status = row_soup.find(text="Status: ").next.strip()
-    row_find = row_soup.find(text=re.compile('Hostess:'))
-    if row_find:
-        o.hostess = row_find.next.strip()
-    row_find = row_soup.find(text=re.compile('Party:'))
-    if row_find:
-        o.party = row_find.next.strip()
-    row_find = row_soup.find(text='Shipped On:')
-    if row_find:
-        ship_date_str = row_find.next.strip()
-        o.ship_date = datetime.strptime(ship_date_str, '%m/%d/%Y')
-    return o
-
-
-def extract_line_items(detail_soup) -> Iterable[OrderLineItem]:
-    line_items_table = detail_soup.find(id='ctl00_main_dgMain')
-    line_items_rows = line_items_table.findAll('tr')[1:]  # skip header row
-    line_items = []
-    for row in line_items_rows:
-        cells = row.findAll('td')
-
-        line_item = OrderLineItem()
-        line_item.sku = cells[0].text.strip()
-        line_item.name = cells[1].text.strip()
-        line_item.price = cells[2].text.strip()
-        line_item.quantity = int(cells[3].text.strip())
-        line_item.total = currency_to_decimal(cells[4].text.strip().split('\n')[0])
-
-        line_items.append(line_item)
-    return line_items
-
-
-def extract_shipping_address(detail_soup) -> str:
-    iter_address_lines = detail_soup.find(text=re.compile('Address')).findNext('dd').stripped_strings
-    shipping_address = '\n'.join(iter_address_lines)
-    return shipping_address
+            resp = request(method, url, **kwargs)
+        except requests.exceptions.Timeout:
+            if deadline.expired:
+                raise DeadlineExceeded
+            raise
+        if read_body and isinstance(resp, requests.Response):
+            return _read_before(resp, deadline)
+        return resp
+
+    return wrapper
+
+
+def governed_request(request, governor=None):
+    """`request` bounded by the active deadline and, with a `governor`, holding one of its slots.
+    The governor is outermost, so a slot is held until the body has been read (streamed
+    under a deadline) and its latency and errors cover the whole download."""
+    request = deadline_bounded(request)
+    if governor is not None:
+        request = governor.governed(request)
+    return request
 
 
 class Workstation(ABC):
     def __init__(self, *args, **kwargs):
-        self.br = Workstation.init_browser()
+        self.governor = AdaptiveLimiter()
+        self.br = Workstation.init_browser(self.governor)
 
     @classmethod
-    def init_browser(cls):
+    def init_browser(cls, governor=None):
+        """Creates the browser. With a `governor` (a `concurrency.AdaptiveLimiter`), every request
+        made through the browser's session waits for a slot from it, so all concurrent fetches
+        share one adaptive in-flight limit."""
         br = mechanicalsoup.StatefulBrowser()
         br.session.headers.update({
             'User-agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36',
         })
+        br.session.request = governed_request(br.session.request, governor)
         return br
 
     @abstractmethod
@@ -233,97 +199,6 @@ class Workstation(ABC):
     def catalog_products(self) -> Iterable[Product]:
         return iter([])
 
-# noinspection PyDunderSlots
-def parse_customer_angel_csv(customers_angel_csv_data):
-    customer_rows = DictReader(customers_angel_csv_data.decode(encoding='utf-8').splitlines())
-    yield from (parse_customer_angel_row(row) for row in customer_rows)
-
-
-def parse_product(row) -> Product:
-    p = Product()
-    p.img = row['img']
-    p.sku = row['sku']
-    p.in_stock = row['inStock']
-    p.price = row['price']
-    p.retail_price = row['priceRetailFull']
-    p.slug = row['slug']
-    p.tags = row['tags']
-    p.title = row['title']
-    p.nas_design = row['nasDesign']
-    p.product_type = row['productType']
-    p.sized_images = row['sizedImages']
-    p.on_sale = row['isOnSale']
-    return p
-
-
-def parse_placed_order_api(item):
-    order = Order()
-    order.id = item['id']
-    order.order_number = item['orderNum']
-    order.customer_id = item['address']['id']
-    order.customer_name = item['address']['name']
-    # order.hostess = item['party']['hostName'] if item['party'] else None
-    # order.party = item['party']['name'] if item['party'] else None
-    order.order_date = datetime.fromtimestamp(item['createdTime'] / 1000)
-    order.status = item['state']
-    # order.ship_date = item.get('shippedDate', None)
-    order.qv = item['qv']
-    # order.retail_bonus = item['']
-    order.total = item['total']
-    order.shipping_fee = item['shipping']
-    order.tax = item['tax']
-    # order.order_type = item['orderType']['orderTypeDescription']
-    order.shipping_name = item['shippingAddress']['name']
-    order.shipping_address = item['shippingAddress']
-    order.subtotal = item['subtotal']
-    # order.customer_contact = item['orderedEmail']
-    order.line_items = []
-    for osi in item['items']:
-        li = OrderLineItem()
-        li.name = osi['description']
-        li.total = osi['total']
-        li.price = osi['price']
-        li.quantity = osi['quantity']
-        li.sku = osi['sku']
-        order.line_items.append(li)
-    return order
-
-
-def parse_order_api(item):
-    order = Order()
-    order.id = item['orderID']
-    order.order_number = item['orderReferenceNum']
-    order.customer_id = item['userId']
-    order.customer_name = '{orderedFirstName} {orderedLastName}'.format(**item)
-    order.hostess = item['party']['hostName'] if item['party'] else None
-    order.party = item['party']['name'] if item['party'] else None
-    order.order_date = datetime.strptime(item['orderedDate'], '%Y-%m-%dT%H:%M:%S')
-    order.status = item['shippedStatus']['description']
-    order.ship_date = item.get('shippedDate', None)
-    order.qv = item['qv']
-    #order.retail_bonus = item['']
-    order.total = item['orderTotal']
-    order.shipping_fee = item['shippingTotal']
-    order.tax = item['taxTotal']
-    order.order_type = item['orderType']['orderTypeDescription']
-    order.shipping_name = f"{item['shippingFirstName']} {item['shippingLastName']}"
-    order.shipping_address = f"{order.shipping_name}\n" \
-                             f"{item['shippingAddress1']}\n" \
-                             f"{item['shippingAddress2']}\n" \
-                             f"{item['shippingCity']}, {item['shippingState']} {item['shippingPostalCode']}"
-    order.subtotal = item['subTotal']
-    order.customer_contact = item['orderedEmail']
-    order.line_items = []
-    for osi in item['orderStatusItems']:
-        li = OrderLineItem()
-        li.name = osi['name']
-        li.total = osi['priceTotal']
-        li.price = osi['pricePer']
-        li.quantity = osi['quantity']
-        li.sku = osi['sku']
-        order.line_items.append(li)
-    return order
-
 
 class OrderNotFoundException(Exception):
     pass
@@ -337,15 +212,14 @@ class JamberryWorkstation(Workstation):
         self._cart_url = None
         self._logged_in = False
         self._consultant_id = None
+        self.tracking_cache = TrackingCache()
+        self.search_cart_store = SearchCartStore()
+        self.search_cart_revalidate_after = 60 * 60  # seconds a stored cart is trusted without a check
         self.workstation_url = 'https://workstation.jamberry.com'
         self.urls = self.init_urls()
         if username is None and password is None:
             self.read_config()
 
-    def __del__(self):
-        if getattr(self, '_cart_url', None) is not None:
-            self.delete_tmp_search_cart_retail()
-
     def init_urls(self):
         urls = dict(
             JAMBERRY_LOGIN_URL=urljoin(self.workstation_url, ''),
@@ -400,22 +274,151 @@ class JamberryWorkstation(Workstation):
 
     def logout(self):
         self.br.get(self.urls['JAMBERRY_LOGOUT_URL'])
-        self.br = Workstation.init_browser()
+        self.br = Workstation.init_browser(self.governor)
         self._logged_in = False
         self._consultant_id = None
 
-    def downline_consultants(self) -> Iterable[Tuple[Consultant, ConsultantActivityRecord]]:
-        data = self.fetch_team_activity_csv()
-        tar = DictReader(data.decode(encoding='utf-8').splitlines())
-        yield from (parse_team_activity_row(row) for row in tar)
-
-    def customers(self) -> Iterable[Customer]:
+    def downline_consultants(self, processes=1, columns=None, deadline=None, min_level=None, max_level=None,
+                             status=None, consultant_type=None, min_qv=None, level_shards=None) \
+            -> Iterable[Tuple[Consultant, ConsultantActivityRecord]]:
+        """Parses the current TAR. For very large organizations, pass `processes=None` to parse
+        on every CPU (see `parse_team_activity_csv`). `columns` limits both the download and the
+        parsing to those CSV columns, e.g. ('Contact', 'DLL', 'Sponsor', 'QV').
+
+        `min_level`/`max_level` (downline level), `status`, `consultant_type` and `min_qv` select
+        consultants; the level range is sent with the request, and the rest is checked on each raw
+        CSV row before it is parsed (see `filters.TarRowFilter`).
+
+        For very large organizations, `level_shards` (True for `DEFAULT_TAR_LEVEL_SHARDS`, or a
+        sequence of (first, last) downline levels) downloads the TAR in concurrent, separately
+        retried pieces; see `fetch_team_activity_csv_sharded`.
+
+        Like every iterator here, it accepts a `deadline` (seconds, or a `deadline.Deadline`)
+        covering login and all requests. The result is then a `deadline.PartialResult` that stops
+        early when time runs out and reports whether it finished in its `complete` attribute."""
+        row_filter = TarRowFilter(min_level, max_level, status, consultant_type, min_qv)
+        return bounded(self._downline_consultants(processes, columns, row_filter, level_shards), deadline)
+
+    def _downline_consultants(self, processes, columns, row_filter, level_shards=None):
+        for data in self._team_activity_chunks(columns, row_filter, level_shards):
+            yield from parse_team_activity_csv(data, processes=processes, columns=columns,
+                                               row_filter=row_filter if row_filter.active else None)
+
+    def downline_consultants_batches(self, batch_size=None, columnar=False, resume_from=None, columns=None,
+                                     deadline=None, min_level=None, max_level=None, status=None,
+                                     consultant_type=None, min_qv=None, level_shards=None) -> Iterable[Batch]:
+        """`downline_consultants` as `batching.Batch`es of `batch_size` (Consultant,
+        ConsultantActivityRecord) pairs, or one batch per TAR download (per level shard with
+        `level_shards`) if no size is given. `columnar=True` turns each batch into a pair of
+        {attribute: [values]} dicts. Cursors are (shard, CSV row), and `resume_from` takes a
+        batch's `next_cursor`. Parsing happens in this process."""
+        row_filter = TarRowFilter(min_level, max_level, status, consultant_type, min_qv)
+        pages = self._team_activity_pages(columns, row_filter, level_shards, resume_position(resume_from))
+        return bounded(batched('downline_consultants', pages, batch_size, columnar), deadline)
+
+    def _team_activity_pages(self, columns, row_filter, level_shards, position):
+        first_page, skip = position
+        if level_shards:
+            # pages are the clipped shards; only download those from the resume point on
+            if level_shards is True:
+                level_shards = DEFAULT_TAR_LEVEL_SHARDS
+            level_shards = tar_level_shards(row_filter.min_level or 1, row_filter.max_level or 9999,
+                                            level_shards)[first_page:]
+            if not level_shards:
+                return
+        elif first_page > 0:
+            return
+        parse = partial(parse_team_activity_row, columns=None if columns is None else tuple(columns))
+        chunks = self._team_activity_chunks(columns, row_filter, level_shards)
+        for page, data in enumerate(chunks, start=first_page):
+            rows = DictReader(StringIO(data.decode(encoding='utf-8'), newline=''))
+            yield page_entries(page, rows, parse, row_filter if row_filter.active else None,
+                               skip if page == first_page else 0)
+
+    def _team_activity_chunks(self, columns, row_filter, level_shards=None) -> Iterable[bytes]:
+        request_columns = columns
+        if columns is not None:
+            request_columns = tuple(columns) + tuple(c for c in row_filter.columns if c not in columns)
+        if level_shards:
+            if level_shards is True:
+                level_shards = DEFAULT_TAR_LEVEL_SHARDS
+            chunks = self.fetch_team_activity_csv_sharded(
+                columns=request_columns,
+                min_level=row_filter.min_level or 1,
+                max_level=row_filter.max_level or 9999,
+                level_shards=level_shards,
+            )
+        else:
+            chunks = [self.fetch_team_activity_csv(
+                levels=row_filter.max_level or '9999',
+                min_level=row_filter.min_level or 1,
+                columns=request_columns,
+            )]
+        return chunks
+
+    def customers(self, deadline=None, customer_id=None, customer_type=None, min_qv=None) -> Iterable[Customer]:
+        """Customers from the volume report. `customer_id`, `customer_type` and `min_qv` (sponsor
+        QV) are checked on the raw rows before they are parsed."""
+        return bounded(self._customers(CustomerFilter(customer_id, customer_type, min_qv)), deadline)
+
+    def _customers(self, row_filter=None):
         data = self.fetch_customer_volume_json()
         j = json.loads(data)
-        yield from (customer_from_row(row) for row in j['rows'])
-
-    def orders(self, start_date=None, end_date=None, include_details=False) -> Iterable[Order]:
-        data = self.fetch_orders_api(start_date, end_date)
+        rows = j['rows']
+        if row_filter is not None and row_filter.active:
+            rows = filter(row_filter, rows)
+        yield from (customer_from_row(row) for row in rows)
+
+    def customers_batches(self, batch_size=None, columnar=False, resume_from=None, deadline=None,
+                          customer_id=None, customer_type=None, min_qv=None) -> Iterable[Batch]:
+        """`customers` as `batching.Batch`es; the volume report is a single page whose
+        cursors are row offsets. See `orders_batches`."""
+        row_filter = CustomerFilter(customer_id, customer_type, min_qv)
+        pages = self._customer_pages(row_filter, resume_position(resume_from))
+        return bounded(batched('customers', pages, batch_size, columnar), deadline)
+
+    def _customer_pages(self, row_filter, position):
+        first_page, skip = position
+        if first_page > 0:
+            return
+        rows = json.loads(self.fetch_customer_volume_json())['rows']
+        yield page_entries(0, rows, customer_from_row, row_filter if row_filter.active else None, skip)
+
+    def merged_customers(self, deadline=None) -> Iterable[CustomerMatch]:
+        """Customers from the volume API joined with their Customer Angel CSV record (email,
+        birthdate). See `merge.merge_customers`."""
+        return bounded(self._merged_customers(), deadline)
+
+    def _merged_customers(self):
+        angel_customers = parse_customer_angel_csv(self.fetch_customer_angel_csv())
+        yield from merge_customers(self._customers(), angel_customers)
+
+    def orders(self, start_date=None, end_date=None, include_details=False, shard_months=None,
+               deadline=None, interner=None, status=None, order_type=None, customer_id=None,
+               min_qv=None) -> Iterable[Order]:
+        """Orders placed between `start_date` and `end_date`. Pass `shard_months` (1 for months, 3
+        for quarters) to fetch the date range as concurrent shards; see `fetch_orders_api_sharded`.
+
+        `status`, `order_type`, `customer_id` and `min_qv` are checked on the raw API items, so
+        rejected orders are never parsed and never have their details fetched.
+
+        To hold a long history in memory, pass an `interning.Interner` (or True for a fresh one)
+        so that orders and line items share their repeated values."""
+        if interner is True:
+            interner = Interner()
+        item_filter = OrderFilter(status, order_type, customer_id, min_qv)
+        orders = self._orders(start_date, end_date, include_details, shard_months, item_filter)
+        if interner is not None:
+            orders = interner.orders(orders)
+        return bounded(orders, deadline)
+
+    def _orders(self, start_date, end_date, include_details, shard_months, item_filter=None):
+        if shard_months:
+            data = self.fetch_orders_api_sharded(start_date, end_date, shard_months)
+        else:
+            data = self.fetch_orders_api(start_date, end_date)
+        if item_filter is not None and item_filter.active:
+            data = filter(item_filter, data)
         order_generator = (parse_order_api(item) for item in data)
 
         if include_details:
@@ -423,10 +426,74 @@ class JamberryWorkstation(Workstation):
         else:
             yield from order_generator
 
-    def catalog_products(self) -> Iterable[Product]:
+    def orders_batches(self, batch_size=None, columnar=False, resume_from=None, start_date=None, end_date=None,
+                       include_details=False, deadline=None, interner=None, status=None, order_type=None,
+                       customer_id=None, min_qv=None) -> Iterable[Batch]:
+        """`orders` grouped into `batching.Batch`es for bulk loading: one batch per order history
+        API page, or `batch_size` orders each. `columnar=True` turns each batch into
+        {attribute: [values]}.
+
+        Each batch has the (page, offset) `cursor` of its first order and the `next_cursor` after
+        its last. Once a batch is stored, keep its `next_cursor`; passing it as `resume_from`
+        starts again from that API page instead of from the beginning. The history is newest
+        first, so orders placed in between shift the pages: resume with a fixed `end_date`."""
+        if interner is True:
+            interner = Interner()
+        item_filter = OrderFilter(status, order_type, customer_id, min_qv)
+        pages = self._order_pages(start_date, end_date, include_details, interner,
+                                  item_filter if item_filter.active else None, resume_position(resume_from))
+        return bounded(batched('orders', pages, batch_size, columnar), deadline)
+
+    def _order_pages(self, start_date, end_date, include_details, interner, item_filter, position):
+        def parse(item):
+            o = parse_order_api(item)
+            if include_details:
+                o = self.add_order_details(o)
+            if interner is not None:
+                interner.order(o)
+            return o
+
+        first_page, skip = position
+        start_date, end_date = self._order_date_range(start_date, end_date)
+        page = first_page
+        more_pages = True
+        while more_pages:
+            current = self.fetch_orders_api_page(start_date, end_date, page)['orderHistoryPage']
+            more_pages = not current['last']
+            yield page_entries(page, current['content'], parse, item_filter, skip if page == first_page else 0)
+            page += 1
+
+    def catalog_products(self, deadline=None) -> Iterable[Product]:
+        return bounded(self._catalog_products(), deadline)
+
+    def _catalog_products(self):
         for p in self.fetch_all_products():
             yield parse_product(p)
 
+    def catalog_products_batches(self, batch_size=None, columnar=False, resume_from=None, deadline=None) \
+            -> Iterable[Batch]:
+        """`catalog_products` as `batching.Batch`es; the catalog is a single page whose cursors
+        are product offsets. See `orders_batches`."""
+        return bounded(batched('catalog_products', self._catalog_pages(resume_position(resume_from)),
+                               batch_size, columnar), deadline)
+
+    def _catalog_pages(self, position):
+        first_page, skip = position
+        if first_page > 0:
+            return
+        yield page_entries(0, self.fetch_all_products(), parse_product, skip=skip)
+
+    def product_index(self) -> ProductIndex:
+        """A local search index over the full catalog; see `search.ProductIndex`."""
+        return ProductIndex(self.catalog_products())
+
+    def sync_product_images(self, directory, max_workers=None):
+        """Mirrors every catalog image into `directory`; see `images.ImageStore`."""
+        urls = (url for p in self.catalog_products() for url in product_image_urls(p))
+        store = ImageStore(directory)
+        return store.sync(urls, self.br.session, base_url=self.workstation_url,
+                          max_workers=max_workers or self.governor.maximum)
+
     def add_order_details(self, order: Order):
         detail_soup = self.fetch_order_detail(order.id)
         order.line_items = extract_line_items(detail_soup)
@@ -434,28 +501,68 @@ class JamberryWorkstation(Workstation):
         return order
 
     @requires_login
-    def fetch_team_activity_csv(self, year=None, month=None, levels='9999'):
+    def fetch_team_activity_csv(self, year=None, month=None, levels='9999', columns=None, min_level=1):
+        """Downloads the Team Activity Report CSV for downline levels `min_level` to `levels`.
+        `columns` (CSV column names such as 'Contact', 'DLL', 'Sponsor', 'QV') limits the report
+        to those columns; by default all are included."""
+        return self._fetch_team_activity_response(year, month, min_level, levels, columns).content
+
+    def _fetch_team_activity_response(self, year, month, min_level, levels, columns):
         if year is None:
             year = datetime.now().year
         if month is None:
             month = datetime.now().month
         filter_data = OrderedDict(
             sort='level',
-            filter='level|between|1|{}'.format(levels),
+            filter='level|between|{}|{}'.format(min_level, levels),
             period=year * 100 + month,  # YYYYMM
             region='US',
             lang='en',
             direct='false',
             start=0,uplineRankId=0,
 
-            trans='CompRank_AdvancedConsultant|Advanced Consultant,CompRank_Consultant|Consultant,CompRank_SeniorConsultant|Senior Consultant,CompRank_LeadConsultant|Lead Consultant,CompRank_TeamManager|Team Manager,CompRank_SeniorTeamManager|Senior Team Manager,CompRank_PremierConsultant|Premier Consultant,CompRank_SeniorLeadConsultant|Senior Lead Consultant,CompRank_Executive|Executive,CompRank_SeniorExecutive|Senior Executive,CompRank_LeadExecutive|Lead Executive,CompRank_EliteExecutive|Elite Executive,ProfessionalConsultant|Professional Consultant,Hobbyist|Hobbyist,FastStart|Fast Start,Active|Active,In Progress|In Progress,generation|GEN,level|DLL,contact|Contact,firstName|First,lastName|Last,email|Email,phone|Phone,address|Address,city|City,state|State,zip|ZIP,country|Country,conference|Attending Conference,start|Enrollment,status|Status,login|Last Login,type|Type,title|Title,pay|Pay Title,prv|RV,qv|QV,pcv|CV,trv|TQV,drv|DQV,active|Active Legs,sponsored|Recruits,svip|SVIPs,downline|Organization Total,tripPts|Trip,manager|Team Manager,sponsor|Sponsor,sponsorEmail|Sponsor Email'
+            trans=tar_trans_param(columns)
         )
         resp = self.br.get(
             self.urls['JAMBERRY_API_TEAM_ACTIVITY_REPORT_URL'].format(self._consultant_id),
             params=filter_data
         )
+        return resp
+
+    @requires_login
+    def fetch_team_activity_csv_shard(self, min_level, max_level, year=None, month=None, columns=None):
+        """One downline level range of the TAR. Unlike `fetch_team_activity_csv`, an HTTP error
+        raises instead of returning the error page."""
+        resp = self._fetch_team_activity_response(year, month, min_level, max_level, columns)
+        resp.raise_for_status()
         return resp.content
 
+    def fetch_team_activity_csv_sharded(self, year=None, month=None, columns=None, min_level=1, max_level=9999,
+                                        level_shards=DEFAULT_TAR_LEVEL_SHARDS, retries=2, retry_delay=1.0,
+                                        max_workers=None) -> Iterable[bytes]:
+        """The TAR for downline levels `min_level` to `max_level`, requested as one report per
+        range in `level_shards` (see `tar_level_shards`). The shards download concurrently and
+        their CSV data is yielded in level order. A shard that fails is retried up to `retries`
+        times, with exponential backoff from `retry_delay` seconds, without touching the others."""
+        shards = tar_level_shards(min_level, max_level, level_shards)
+        self.login()
+
+        def fetch_shard(shard):
+            for attempt in range(retries + 1):
+                try:
+                    return self.fetch_team_activity_csv_shard(shard[0], shard[1], year, month, columns)
+                except DeadlineExceeded:
+                    raise
+                except Exception:
+                    if attempt == retries:
+                        raise
+                    _sleep_before_deadline(retry_delay * 2 ** attempt)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.governor.maximum) as executor:
+            futures = [executor.submit(bind_current(fetch_shard), shard) for shard in shards]
+            for future in futures:
+                yield future.result()
+
     @deprecated("use fetch_orders_api instead")
     @requires_login
     def fetch_orders(self):
@@ -471,31 +578,61 @@ class JamberryWorkstation(Workstation):
 
     @requires_login
     def fetch_orders_api(self, start_date='2014-01-01', end_date=None):
+        start_date, end_date = self._order_date_range(start_date, end_date)
+        more_pages = True
+        current_page = 0
+        while more_pages:
+            current = self.fetch_orders_api_page(start_date, end_date, current_page)
+            current_page += 1
+            more_pages = not current['orderHistoryPage']['last']
+            yield from current['orderHistoryPage']['content']
+
+    @requires_login
+    def fetch_orders_api_page(self, start_date, end_date, page):
+        resp = self.br.get(
+            self.urls['JAMBERRY_ORDERS_API_URL'],
+            params=dict(
+                userId=self._consultant_id,
+                startDate=start_date,
+                endDate=end_date,
+                page=page,
+                searchType='MINE_AND_SPONSORED_ORDERS',
+                tz='America/New_York',
+            )
+        )
+        return resp.json()
+
+    def fetch_orders_api_sharded(self, start_date='2014-01-01', end_date=None, shard_months=1, max_workers=None):
+        """Same results as `fetch_orders_api`, but the date range is split into blocks of
+        `shard_months` months (3 for quarters) that are paginated concurrently. Like the API,
+        orders are yielded newest first, and each order id only once, even if shards overlap.
+        How many requests actually run at once is decided by `self.governor`."""
+        start_date, end_date = self._order_date_range(start_date, end_date)
+        shards = date_shards(start_date, end_date, shard_months)
+        self.login()
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers or self.governor.maximum) as executor:
+            fetch_shard = bind_current(lambda shard: list(self.fetch_orders_api(*shard)))
+            futures = [executor.submit(fetch_shard, shard) for shard in shards]
+            for future in reversed(futures):
+                items = sorted(future.result(), key=lambda item: item['orderedDate'], reverse=True)
+                for item in items:
+                    if item['orderID'] not in seen:
+                        seen.add(item['orderID'])
+                        yield item
+
+    @staticmethod
+    def _order_date_range(start_date, end_date):
         date_format = '%Y-%m-%d'
+        if start_date is None:
+            start_date = '2014-01-01'
         if end_date is None:
             end_date = datetime.now().strftime(date_format)
         if isinstance(start_date, datetime):
             start_date = start_date.strftime(date_format)
         if isinstance(end_date, datetime):
             end_date = end_date.strftime(date_format)
-        more_pages = True
-        current_page = 0
-        while more_pages:
-            resp = self.br.open(
-                self.urls['JAMBERRY_ORDERS_API_URL'],
-                params=dict(
-                    userId=self._consultant_id,
-                    startDate=start_date,
-                    endDate=end_date,
-                    page=current_page,
-                    searchType='MINE_AND_SPONSORED_ORDERS',
-                    tz='America/New_York',
-                )
-            )
-            current = resp.json()
-            current_page += 1
-            more_pages = not current['orderHistoryPage']['last']
-            yield from current['orderHistoryPage']['content']
+        return start_date, end_date
 
     @requires_login
     def fetch_order_detail_api(self, reference_num):
@@ -506,9 +643,40 @@ class JamberryWorkstation(Workstation):
     @requires_login
     def fetch_order_tracking(self, order_id):
         url = self.urls['JAMBERRY_ORDER_TRACKING_API_URL'] + str(order_id)
-        resp = self.br.open(url)
+        resp = self.br.get(url)
         return resp.json()
 
+    def fetch_order_tracking_batch(self, order_ids, max_workers=None, cache=None, force=False) -> dict:
+        """Tracking results for many orders, keyed by order id.
+
+        Only orders that are due according to `cache` (default: `self.tracking_cache`) are
+        fetched, concurrently; delivered orders and recently polled in-transit orders are
+        answered from the cache. Pass `force=True` to refetch every non-terminal order.
+
+        An order whose fetch fails keeps its previous result (None if there is none) and stays
+        due; the exceptions are listed in `cache.errors`. Every other result is still cached."""
+        if cache is None:
+            cache = self.tracking_cache
+        order_ids = [str(order_id) for order_id in order_ids]
+        now = cache.clock()
+        due = [
+            order_id for order_id in dict.fromkeys(order_ids)
+            if cache.is_due(order_id, now) or (force and cache.next_poll(order_id) is not None)
+        ]
+        cache.errors = {}
+        if due:
+            self.login()
+            with ThreadPoolExecutor(max_workers=max_workers or self.governor.maximum) as executor:
+                fetch = bind_current(self.fetch_order_tracking)
+                futures = {executor.submit(fetch, order_id): order_id for order_id in due}
+                for future in as_completed(futures):
+                    order_id = futures[future]
+                    try:
+                        cache.update(order_id, future.result())
+                    except Exception as e:
+                        cache.errors[order_id] = e
+        return {order_id: cache.get(order_id) for order_id in order_ids}
+
 
     @requires_login
     def fetch_customer_angel_csv(self):
@@ -553,6 +721,8 @@ class JamberryWorkstation(Workstation):
         )
         resp = self.br.post(self.urls['JAMBERRY_CREATE_NEW_RETAIL_CART_POST_URL'], data=form_data)
         self._cart_url = resp.url
+        if self.search_cart_store is not None:
+            self.search_cart_store.put(self.username, self._cart_url)
 
     @requires_login
     def delete_tmp_search_cart_retail(self):
@@ -560,12 +730,41 @@ class JamberryWorkstation(Workstation):
         payload = {'CartType': 'Retail'}
         self.br.get(delete_cart_post_url, params=payload)
         self._cart_url = None
+        if self.search_cart_store is not None:
+            self.search_cart_store.forget(self.username)
+
+    @requires_login
+    def validate_search_cart(self, cart_url) -> bool:
+        """Checks that a previously created search cart still exists."""
+        resp = self.br.get(cart_url)
+        return resp.status_code == 200 and 'cart/display' in resp.url
+
+    def search_cart_url(self):
+        """URL of the search cart, reusing one stored by any earlier session of this account when
+        it still works (checked at most every `search_cart_revalidate_after` seconds) and only
+        creating a new cart otherwise. The cart is kept for reuse; call
+        `delete_tmp_search_cart_retail` to remove it."""
+        if self._cart_url is not None:
+            return self._cart_url
+        store = self.search_cart_store
+        stored = store.get(self.username) if store is not None else None
+        if stored is not None:
+            url, validated = stored
+            if store.clock() - validated < self.search_cart_revalidate_after:
+                self._cart_url = url
+                return url
+            if self.validate_search_cart(url):
+                store.put(self.username, url)
+                self._cart_url = url
+                return url
+            store.forget(self.username)
+        self.create_tmp_search_cart_retail()
+        return self._cart_url
 
     def fetch_all_products(self, search_keys='aeiou*'):
         """By default, fetches and combines 5 autocomplete results, to effectively
            get a full catalog. You can provide any iterable to `search_keys`."""
-        if self._cart_url is None:
-            self.create_tmp_search_cart_retail()
+        self.search_cart_url()
         results = (self.fetch_autocomplete_json(search_key) for search_key in search_keys)
         product_lists = (result['products'] for result in results)
         products = {}
@@ -578,8 +777,8 @@ class JamberryWorkstation(Workstation):
         yield from products.values()
 
     @requires_login
-    def fetch_autocomplete_json(self, search_key):
-        search_url = self._cart_url.replace('cart/display', 'search/products')
+    def fetch_autocomplete_json(self, search_key, retry=True):
+        search_url = self.search_cart_url().replace('cart/display', 'search/products')
         defaults = (
             ('cartType', 'Retail'),
             ('catalogType', 'retail'),
@@ -587,7 +786,14 @@ class JamberryWorkstation(Workstation):
         )
         payload = dict(defaults + (('q', search_key),))
         resp = self.br.get(search_url, params=payload)
-        json_result = json.loads(resp.content, encoding='ISO-8859-1')
+        if resp.status_code == 404 and retry:
+            # the reused cart is gone; make a new one and try again
+            self._cart_url = None
+            if self.search_cart_store is not None:
+                self.search_cart_store.forget(self.username)
+            self.create_tmp_search_cart_retail()
+            return self.fetch_autocomplete_json(search_key, retry=False)
+        json_result = json.loads(resp.content)
         return json_result
 
     def read_config(self):
@@ -1 +1 @@
-from tests.fixtures.workstation import ws, order_detail_html, order_row_html
+from tests.fixtures.workstation import ws, order_detail_html, order_row_html, tar_csv_data
@@ -1,3 +1,5 @@
+import csv
+import io
 from configparser import ConfigParser
 from pathlib import Path
 import os
@@ -30,3 +32,70 @@ def order_row_html():
     return html
 
 
+
+
+TAR_HEADERS = [
+    'GEN', 'DLL', 'Contact', 'First', 'Last', 'Email', 'Phone', 'Address', 'City', 'State', 'ZIP', 'Country',
+    'Attending Conference', 'Enrollment', 'Status', 'Last Login', 'Type', 'Title', 'Pay Title', 'RV', 'QV', 'CV',
+    'TQV', 'DQV', 'Active Legs', 'Recruits', 'SVIPs', 'Organization Total', 'Trip', 'Team Manager', 'Sponsor',
+    'Sponsor Email', 'highest',
+]
+
+
+def make_tar_row(contact, level=1, title='Consultant', status='Active', qv='$100.00'):
+    return {
+        'GEN': '1', 'DLL': str(level), 'Contact': str(contact), 'First': 'First', 'Last': f'Last{contact}',
+        'Email': f'c{contact}@example.com', 'Phone': '5555551212', 'Address': '1 Main St', 'City': 'Somewhere',
+        'State': 'NV', 'ZIP': '12345', 'Country': 'US', 'Attending Conference': 'No', 'Enrollment': '01/02/2017',
+        'Status': status, 'Last Login': '', 'Type': 'Professional Consultant', 'Title': title,
+        'Pay Title': title, 'RV': '$10.00', 'QV': qv, 'CV': '$10.00', 'TQV': '$1,000.00', 'DQV': '($5.00)',
+        'Active Legs': '0', 'Recruits': '0', 'SVIPs': '0', 'Organization Total': '0', 'Trip': '0',
+        'Team Manager': 'Someone', 'Sponsor': 'Sponsor Name', 'Sponsor Email': 'sponsor@example.com',
+        'highest': title,
+    }
+
+
+def make_tar_csv(rows) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=TAR_HEADERS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode('utf-8')
+
+
+@pytest.fixture()
+def tar_csv_data():
+    return make_tar_csv(make_tar_row(contact, level=1 + contact % 4) for contact in range(1, 51))
+
+
+def make_order_item(order_id, status='Shipped'):
+    return {
+        'orderID': order_id, 'orderReferenceNum': f'R{order_id}', 'userId': 7, 'orderedFirstName': 'Pat',
+        'orderedLastName': 'Doe', 'party': None, 'orderedDate': '2018-03-01T10:00:00',
+        'shippedStatus': {'description': status}, 'qv': 25.0, 'orderTotal': 30.0, 'shippingTotal': 3.0,
+        'taxTotal': 2.0, 'orderType': {'orderTypeDescription': 'Retail'}, 'shippingFirstName': 'Pat',
+        'shippingLastName': 'Doe', 'shippingAddress1': '1 Main St', 'shippingAddress2': '',
+        'shippingCity': 'Somewhere', 'shippingState': 'NV', 'shippingPostalCode': '12345', 'subTotal': 25.0,
+        'orderedEmail': 'pat@example.com', 'orderStatusItems': [],
+    }
+
+
+class OfflineWorkstation(JamberryWorkstation):
+    """A JamberryWorkstation that never logs in; tests override the fetch_* methods they need."""
+
+    def __init__(self):
+        super().__init__('username', 'password')
+        self._consultant_id = '1234'
+
+    def login(self):
+        self._logged_in = True
+
+
+class FakeClock:
+    """A clock for tests that only moves when `now` is changed."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
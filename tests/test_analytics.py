@@ -0,0 +1,70 @@
+from datetime import datetime
+from decimal import Decimal
+
+from src.jamberry.analytics import SalesIndex, period_key
+from src.jamberry.order import Order, OrderLineItem
+
+
+def make_order(order_id, customer_id, order_date, qv, items):
+    o = Order()
+    o.id = order_id
+    o.customer_id = customer_id
+    o.customer_name = f'Customer {customer_id}'
+    o.order_date = order_date
+    o.qv = qv
+    o.total = qv
+    o.line_items = []
+    for sku, quantity in items:
+        li = OrderLineItem()
+        li.sku = sku
+        li.name = sku
+        li.price = '15.00'
+        li.quantity = quantity
+        li.total = Decimal('15.00') * quantity
+        o.line_items.append(li)
+    return o
+
+
+def test_period_key():
+    d = datetime(2018, 5, 17)
+    assert period_key(d) == '2018-05'
+    assert period_key(d, 'quarter') == '2018-Q2'
+    assert period_key(d, 'year') == '2018'
+
+
+def test_sales_index_rollups():
+    index = SalesIndex()
+    index.add_orders([
+        make_order(1, 'a', datetime(2018, 1, 3), 30, [('SKU1', 2)]),
+        make_order(2, 'b', datetime(2018, 1, 9), 15, [('SKU1', 1), ('SKU2', 1)]),
+        make_order(3, 'a', datetime(2018, 2, 1), 45, [('SKU2', 3)]),
+    ])
+    assert index.units_sold('SKU1') == 3
+    assert index.units_sold('SKU1', '2018-01') == 3
+    assert index.units_by_period('SKU2') == [('2018-01', 1), ('2018-02', 3)]
+    assert index.top_customers(1) == [('a', Decimal(75))]
+    assert index.repeat_purchase_rate() == 0.5
+    assert index.periods() == ['2018-01', '2018-02']
+
+
+def test_sales_index_replaces_duplicate_orders():
+    index = SalesIndex()
+    index.add_order(make_order(1, 'a', datetime(2018, 1, 3), 30, [('SKU1', 2)]))
+    index.add_order(make_order(2, 'a', datetime(2018, 1, 4), 30, [('SKU1', 1)]))
+    assert index.repeat_customer_count == 1
+    index.add_order(make_order(2, 'b', datetime(2018, 1, 4), 30, [('SKU1', 5)]))
+    assert len(index) == 2
+    assert index.units_sold('SKU1') == 7
+    assert index.repeat_customer_count == 0
+    assert index.customer_order_count('a') == 1
+
+
+def test_sales_index_tolerates_unparsed_amounts():
+    index = SalesIndex()
+    o = make_order(1, 'c1', datetime(2018, 3, 1), Decimal('30.00'), [('JN001', 1), ('JN002', 1)])
+    o.line_items[0].total = 'N/A'
+    o.line_items[1].total = '$15.00'
+    index.add_order(o)
+    assert len(index) == 1
+    assert index.sku_sales('JN001') == 0
+    assert index.sku_sales('JN002') == Decimal('15.00')
@@ -0,0 +1,89 @@
+from src.jamberry.batching import batched, page_entries, to_columns
+from tests.fixtures.workstation import OfflineWorkstation, make_order_item, make_tar_csv, make_tar_row
+
+
+class PagedOrdersWorkstation(OfflineWorkstation):
+    """Three orders per order history page; order 4 is cancelled."""
+
+    def __init__(self, count=8):
+        super().__init__()
+        self.items = [make_order_item(i, 'Cancelled' if i == 4 else 'Shipped') for i in range(count)]
+        self.pages_fetched = []
+
+    def fetch_orders_api_page(self, start_date, end_date, page):
+        self.pages_fetched.append(page)
+        content = self.items[page * 3:(page + 1) * 3]
+        return {'orderHistoryPage': {'content': content, 'last': (page + 1) * 3 >= len(self.items)}}
+
+
+def test_batched_fixed_size_spans_pages():
+    pages = [page_entries(0, 'abc', str.upper), page_entries(1, 'de', str.upper, skip=1)]
+    batches = list(batched('letters', pages, batch_size=2))
+    assert [b.items for b in batches] == [['A', 'B'], ['C', 'E']]
+    assert [(b.cursor, b.next_cursor) for b in batches] == [((0, 0), (0, 2)), ((0, 2), (2, 0))]
+    assert batches[1].page == 0
+
+
+def test_to_columns():
+    ws = PagedOrdersWorkstation(count=2)
+    orders = list(ws.orders())
+    assert to_columns(orders)['id'] == [0, 1]
+    assert to_columns([]) == {}
+
+
+def test_orders_batches_page_aligned_and_resume():
+    ws = PagedOrdersWorkstation()
+    batches = list(ws.orders_batches(start_date='2018-01-01', end_date='2018-12-31', status='Shipped'))
+    assert [[o.id for o in b.items] for b in batches] == [[0, 1, 2], [3, 5], [6, 7]]
+    assert [b.next_cursor for b in batches] == [(1, 0), (2, 0), (3, 0)]
+
+    ws.pages_fetched = []
+    resumed = list(ws.orders_batches(batch_size=2, resume_from=batches[0].next_cursor, columnar=True,
+                                     start_date='2018-01-01', end_date='2018-12-31'))
+    assert ws.pages_fetched == [1, 2]
+    assert [b.items['id'] for b in resumed] == [[3, 4], [5, 6], [7]]
+    assert resumed[0].next_cursor == (1, 2)
+    again = ws.orders_batches(batch_size=2, resume_from=resumed[0].next_cursor,
+                              start_date='2018-01-01', end_date='2018-12-31')
+    assert [o.id for b in again for o in b.items] == [5, 6, 7]
+
+
+def test_downline_consultants_batches():
+    class TarWorkstation(OfflineWorkstation):
+        def fetch_team_activity_csv(self, year=None, month=None, levels='9999', columns=None, min_level=1):
+            return make_tar_csv(make_tar_row(contact) for contact in range(1, 11))
+
+    ws = TarWorkstation()
+    batches = list(ws.downline_consultants_batches(batch_size=4, columnar=True, columns=['Contact', 'QV']))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    consultants, activity = batches[0].items
+    assert consultants['id'] == ['1', '2', '3', '4']
+    assert len(activity['qv']) == 4
+    rest = ws.downline_consultants_batches(resume_from=batches[1].next_cursor)
+    assert [[c.id for c, a in b.items] for b in rest] == [['9', '10']]
+
+
+def test_downline_consultants_batches_resume_shards():
+    class ShardWorkstation(OfflineWorkstation):
+        def __init__(self):
+            super().__init__()
+            self.requests = []
+
+        def fetch_team_activity_csv_shard(self, min_level, max_level, year=None, month=None, columns=None):
+            self.requests.append((min_level, max_level))
+            return make_tar_csv(make_tar_row(level * 10 + i, level=level)
+                                for level in range(min_level, min(max_level, 4) + 1) for i in range(2))
+
+    ws = ShardWorkstation()
+    shards = [(1, 1), (2, 2), (3, 9999)]
+    batches = list(ws.downline_consultants_batches(level_shards=shards, max_level=4))
+    assert [b.page for b in batches] == [0, 1, 2]
+    ws.requests = []
+    rest = list(ws.downline_consultants_batches(level_shards=shards, max_level=4, resume_from=(1, 1)))
+    assert sorted(ws.requests) == [(2, 2), (3, 4)]
+    assert [b.page for b in rest] == [1, 2]
+    assert [c.id for c, a in rest[0].items] == ['21']
+    assert rest[-1].next_cursor == (3, 0)
+    ws.requests = []
+    assert list(ws.downline_consultants_batches(level_shards=shards, resume_from=(3, 0))) == []
+    assert ws.requests == []
@@ -0,0 +1,67 @@
+from src.jamberry.cart import SearchCartStore
+from tests.fixtures.workstation import FakeClock, OfflineWorkstation
+
+
+class CartWorkstation(OfflineWorkstation):
+    def __init__(self, store, valid=True):
+        super().__init__()
+        self.search_cart_store = store
+        self.valid = valid
+        self.created = 0
+        self.validated = 0
+
+    def create_tmp_search_cart_retail(self):
+        self.created += 1
+        self._cart_url = f'https://workstation/cart/display/{self.created}'
+        self.search_cart_store.put(self.username, self._cart_url)
+
+    def validate_search_cart(self, cart_url):
+        self.validated += 1
+        return self.valid
+
+
+def test_search_cart_store(tmp_path):
+    store = SearchCartStore(tmp_path / 'carts.json')
+    assert store.get('me') is None
+    store.put('me', 'https://cart/1')
+    assert SearchCartStore(tmp_path / 'carts.json').get('me')[0] == 'https://cart/1'
+    store.forget('me')
+    assert store.get('me') is None
+
+
+def test_search_cart_reused_across_sessions(tmp_path):
+    clock = FakeClock()
+    store = SearchCartStore(tmp_path / 'carts.json', clock=clock)
+    first = CartWorkstation(store)
+    url = first.search_cart_url()
+    assert first.created == 1
+
+    second = CartWorkstation(store)
+    assert second.search_cart_url() == url
+    assert second.created == 0
+    assert second.validated == 0
+
+    clock.now += 2 * 60 * 60
+    third = CartWorkstation(store)
+    assert third.search_cart_url() == url
+    assert third.validated == 1
+
+    clock.now += 2 * 60 * 60
+    fourth = CartWorkstation(store, valid=False)
+    fourth.search_cart_url()
+    assert fourth.validated == 1
+    assert fourth.created == 1
+
+
+def test_autocomplete_json_keeps_utf8(tmp_path):
+    class FakeResponse:
+        status_code = 200
+        content = '{"products": [{"sku": "JN001", "name": "Crème Brûlée"}]}'.encode('utf-8')
+
+    class FakeBrowser:
+        def get(self, url, params=None):
+            return FakeResponse()
+
+    ws = CartWorkstation(SearchCartStore(tmp_path / 'carts.json'))
+    ws.br = FakeBrowser()
+    assert ws.fetch_autocomplete_json('a')['products'][0]['name'] == 'Crème Brûlée'
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from src.jamberry.concurrency import AdaptiveLimiter, ERROR, SUCCESS, THROTTLED
+from src.jamberry.deadline import DeadlineExceeded
+from tests.fixtures.workstation import FakeClock
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_additive_increase_multiplicative_decrease():
+    limiter = AdaptiveLimiter(initial=4, maximum=8)
+    for _ in range(4):
+        limiter.release(limiter.acquire(), SUCCESS)
+    assert limiter.limit == pytest.approx(5.0, abs=0.1)
+    limiter.release(limiter.acquire(), THROTTLED)
+    assert limiter.limit == pytest.approx(2.5, abs=0.1)
+
+
+def test_one_decrease_per_round():
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+    starts = [limiter.acquire() for _ in range(4)]
+    for started in starts:
+        limiter.release(started, ERROR)
+    assert limiter.limit == 4
+    limiter.release(limiter.acquire(), ERROR)
+    assert limiter.limit == 2
+
+
+def test_acquire_times_out():
+    limiter = AdaptiveLimiter(initial=1)
+    limiter.acquire()
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(timeout=0.01)
+
+
+def test_governed_limits_in_flight_requests():
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def request(method, url):
+        with lock:
+            active.append(url)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(url)
+        return FakeResponse(503 if url == 'throttle' else 200)
+
+    governed = limiter.governed(request)
+    threads = [threading.Thread(target=governed, args=('GET', str(i))) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+    governed('GET', 'throttle')
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
+
+
+def test_latency_baseline_per_endpoint():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=8, maximum=8, clock=clock)
+
+    def call(endpoint, seconds):
+        started = limiter.acquire()
+        clock.now += seconds
+        limiter.release(started, SUCCESS, endpoint)
+
+    for _ in range(5):
+        call('orders', 0.2)
+        call('tar', 30)
+    call('tar', 40)
+    assert limiter.limit == 8
+    call('orders', 2)
+    assert limiter.limit == 4
@@ -0,0 +1,162 @@
+import io
+import time
+
+import pytest
+import requests
+
+from src.jamberry.deadline import Deadline, DeadlineExceeded, PartialResult, bounded, current_deadline
+from src.jamberry.concurrency import AdaptiveLimiter
+from src.jamberry.workstation import deadline_bounded, governed_request
+from tests.fixtures.workstation import FakeClock, OfflineWorkstation, make_order_item
+
+
+def test_partial_result_stops_at_deadline():
+    clock = FakeClock(0.0)
+    deadline = Deadline(10, clock=clock)
+
+    def slow_items():
+        for i in range(5):
+            assert current_deadline() is deadline
+            clock.now += 4
+            yield i
+
+    result = bounded(slow_items(), deadline)
+    assert isinstance(result, PartialResult)
+    assert list(result) == [0, 1, 2]
+    assert not result.complete
+
+    result = bounded(iter([1, 2]), 100)
+    assert list(result) == [1, 2]
+    assert result.complete
+    assert bounded([1], None) == [1]
+
+
+def test_deadline_bounded_request():
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(kwargs.get('timeout'))
+        return 'response'
+
+    bounded_request = deadline_bounded(request)
+    assert bounded_request('GET', 'http://example.com') == 'response'
+    clock = FakeClock(0.0)
+    deadline = Deadline(10, clock=clock)
+    with deadline.activate():
+        bounded_request('GET', 'http://example.com', timeout=30)
+        bounded_request('GET', 'http://example.com', timeout=3)
+        clock.now = 10
+        with pytest.raises(DeadlineExceeded):
+            bounded_request('GET', 'http://example.com')
+    assert calls == [None, 10, 3]
+
+
+class SlowOrderWorkstation(OfflineWorkstation):
+    def fetch_orders_api_page(self, start_date, end_date, page):
+        if page > 0:
+            raise DeadlineExceeded
+        return {'orderHistoryPage': {'content': [{'orderID': 1}, {'orderID': 2}], 'last': False}}
+
+
+def test_orders_deadline_returns_partial_result():
+    ws = SlowOrderWorkstation()
+    result = PartialResult(ws.fetch_orders_api(), Deadline(60))
+    assert [item['orderID'] for item in result] == [1, 2]
+    assert not result.complete
+    assert isinstance(ws.orders(deadline=60), PartialResult)
+
+
+class EndlessSlowOrderWorkstation(OfflineWorkstation):
+    """An order history with no last page where every page takes 50ms."""
+
+    def fetch_orders_api_page(self, start_date, end_date, page):
+        time.sleep(0.05)
+        return {'orderHistoryPage': {'content': [make_order_item(page)], 'last': False}}
+
+
+def test_orders_deadline_stops_slow_pagination():
+    started = time.monotonic()
+    result = EndlessSlowOrderWorkstation().orders(deadline=0.3)
+    orders = list(result)
+    assert not result.complete
+    assert 1 <= len(orders) <= 6
+    assert time.monotonic() - started < 1
+
+
+class TrickleRaw:
+    """A response body that arrives one small chunk at a time, forever."""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def read(self, amount=None, decode_content=None):
+        self.clock.now += 1
+        return b'x' * 10
+
+    def close(self):
+        pass
+
+
+def test_deadline_bounded_stops_trickling_body():
+    clock = FakeClock(0.0)
+    kwargs_seen = []
+
+    def request(method, url, **kwargs):
+        kwargs_seen.append(kwargs)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.raw = TrickleRaw(clock)
+        return resp
+
+    bounded_request = deadline_bounded(request)
+    with Deadline(10, clock=clock).activate():
+        with pytest.raises(DeadlineExceeded):
+            bounded_request('GET', 'http://example.com')
+    assert kwargs_seen[0]['stream'] is True
+    assert clock.now == 10
+
+    def complete_request(method, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.raw = io.BytesIO(b'{"ok": true}')
+        return resp
+
+    with Deadline(10, clock=FakeClock(0.0)).activate():
+        assert deadline_bounded(complete_request)('GET', 'http://example.com').json() == {'ok': True}
+
+
+def test_governor_slot_held_while_body_downloads():
+    governor = AdaptiveLimiter(initial=4)
+    in_flight = []
+
+    class RecordingRaw:
+        def __init__(self, fail):
+            self.fail = fail
+            self.done = False
+
+        def read(self, amount=None, decode_content=None):
+            in_flight.append(governor.in_flight)
+            if self.fail:
+                raise IOError('connection dropped')
+            if self.done:
+                return b''
+            self.done = True
+            return b'{}'
+
+        def close(self):
+            pass
+
+    def request(method, url, fail=False, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.raw = RecordingRaw(fail)
+        return resp
+
+    bounded_request = governed_request(request, governor)
+    with Deadline(60).activate():
+        assert bounded_request('GET', 'http://example.com').json() == {}
+        assert in_flight and set(in_flight) == {1}
+        with pytest.raises(IOError):
+            bounded_request('GET', 'http://example.com', fail=True)
+    assert governor.in_flight == 0
+    assert governor.limit < 4
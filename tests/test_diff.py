@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+import pytest
+
+from src.jamberry.diff import diff_team_activity, sorted_by_contact, tar_snapshot, NewConsultant, \
+    DroppedConsultant, TitleChange, StatusChange, VolumeChange
+from src.jamberry.parsers import parse_team_activity_csv
+from tests.fixtures.workstation import make_tar_csv, make_tar_row
+
+
+def test_sorted_by_contact_spills_to_disk():
+    rows = [make_tar_row(contact) for contact in (5, 12, 3, 40, 1, 22, 7)]
+    entries = sorted_by_contact(tar_snapshot(rows), chunk_size=2)
+    assert [e[1] for e in entries] == ['1', '3', '5', '7', '12', '22', '40']
+
+
+@pytest.mark.parametrize('chunk_size', [2, 1000])
+def test_diff_team_activity(chunk_size):
+    old = make_tar_csv([
+        make_tar_row(1),
+        make_tar_row(2, title='Consultant'),
+        make_tar_row(3, status='Active'),
+        make_tar_row(4, qv='$100.00'),
+        make_tar_row(5, qv='$100.00'),
+    ])
+    new_rows = [
+        make_tar_row(6),
+        make_tar_row(5, qv='$110.00'),
+        make_tar_row(4, qv='$400.00'),
+        make_tar_row(3, status='Inactive'),
+        make_tar_row(2, title='Senior Consultant'),
+    ]
+    events = list(diff_team_activity(old, new_rows, volume_threshold=Decimal(50), chunk_size=chunk_size))
+    assert [(type(e), e.contact) for e in events] == [
+        (DroppedConsultant, '1'),
+        (TitleChange, '2'),
+        (StatusChange, '3'),
+        (VolumeChange, '4'),
+        (NewConsultant, '6'),
+    ]
+    assert events[1].new == 'Senior Consultant'
+    assert events[3].delta == Decimal(300)
+
+
+def test_diff_team_activity_parsed_snapshots(tar_csv_data):
+    old = parse_team_activity_csv(tar_csv_data)
+    new = parse_team_activity_csv(tar_csv_data)
+    assert list(diff_team_activity(old, new)) == []
+
+
+def test_tar_snapshot_multiline_address():
+    rows = [make_tar_row(contact) for contact in (1, 2, 3)]
+    rows[1]['Address'] = 'Apt 4\r\nBldg B'
+    rows[2]['Address'] = 'Suite\x0c9\u2028Rear'  # line breaks to str.splitlines, not to csv
+    data = make_tar_csv(rows)
+    assert [e[1] for e in tar_snapshot(data)] == ['1', '2', '3']
+    assert list(diff_team_activity(data, rows)) == []
@@ -0,0 +1,78 @@
+import json
+import pickle
+
+import pytest
+
+from src.jamberry.filters import CustomerFilter, OrderFilter, TarRowFilter
+from src.jamberry.parsers import parse_team_activity_csv
+from tests.fixtures.workstation import OfflineWorkstation, make_tar_row
+
+
+def order_item(order_id, status='Shipped', order_type='Retail', user_id=7, qv=25.0):
+    return {
+        'orderID': order_id,
+        'shippedStatus': {'description': status},
+        'orderType': {'orderTypeDescription': order_type},
+        'userId': user_id,
+        'qv': qv,
+    }
+
+
+def test_order_filter():
+    assert not OrderFilter().active
+    f = OrderFilter(status=['Shipped', 'Delivered'], customer_id=7, min_qv=20)
+    assert f(order_item(1))
+    assert not f(order_item(2, status='Cancelled'))
+    assert not f(order_item(3, user_id=8))
+    assert not f(order_item(4, qv=19.99))
+    assert not OrderFilter(order_type='Party')(order_item(5))
+    for cls in (OrderFilter, CustomerFilter, TarRowFilter):
+        with pytest.raises(ValueError):
+            cls(min_qv='abc')
+        with pytest.raises(ValueError):
+            cls(min_qv='nan')
+    assert TarRowFilter(min_qv='50').min_qv == 50
+    assert OrderFilter(min_qv='12.5')(order_item(6, qv='12.5'))
+    assert not TarRowFilter(min_qv='50')(make_tar_row(1, qv='12'))
+    assert TarRowFilter(min_qv='0')(make_tar_row(1, qv='0'))
+    assert CustomerFilter(min_qv=' 50 ')({'userId': 1, 'customerType': 'Retail', 'sponsorQV': '$1,050.00'})
+
+
+def test_customer_filter():
+    f = CustomerFilter(customer_type='Retail', min_qv='$50.00')
+    assert f({'userId': 1, 'customerType': 'Retail', 'sponsorQV': 75})
+    assert not f({'userId': 1, 'customerType': 'Retail', 'sponsorQV': 25})
+    assert not f({'userId': 1, 'customerType': 'Host', 'sponsorQV': 75})
+
+
+def test_tar_row_filter(tar_csv_data):
+    f = TarRowFilter(max_level=2, min_qv=50)
+    assert f.columns == ('DLL', 'QV')
+    assert f(make_tar_row(1, level=2))
+    assert not f(make_tar_row(1, level=3))
+    assert not f(make_tar_row(1, qv='$10.00'))
+    f = pickle.loads(pickle.dumps(f))
+    serial = list(parse_team_activity_csv(tar_csv_data, row_filter=f))
+    parallel = list(parse_team_activity_csv(tar_csv_data, processes=2, chunk_size=7, row_filter=f))
+    assert [c.id for c, a in serial] == [c.id for c, a in parallel]
+    assert len(serial) == 25
+    assert all(c.downline_level <= 2 for c, a in serial)
+
+
+class CustomerWorkstation(OfflineWorkstation):
+    def fetch_customer_volume_json(self):
+        rows = [
+            {'userId': i, 'name': f'Customer {i}', 'address1': '', 'address2': '', 'city': '', 'state': '',
+             'zip': '', 'country': '', 'phone': '', 'customerType': 'Retail', 'firstPurchase': '',
+             'lastPurchase': '', 'sponsorQV': 10 * i, 'sponsorRV': 0, 'allQV': 0, 'allRV': 0,
+             'origConsultant': ''}
+            for i in range(10)
+        ]
+        return json.dumps({'rows': rows}).encode('utf-8')
+
+
+def test_customers_filter_before_parsing():
+    ws = CustomerWorkstation()
+    assert [c.id for c in ws.customers(min_qv=70)] == [7, 8, 9]
+    assert [c.id for c in ws.customers(customer_id=['3', 4])] == [3, 4]
+    assert len(list(ws.customers())) == 10
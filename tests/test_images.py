@@ -0,0 +1,68 @@
+from src.jamberry.images import ImageStore, product_image_urls
+from src.jamberry.product import Product
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError(self.status_code)
+
+
+class FakeSession:
+    """Serves fixed image bytes and honours If-None-Match."""
+
+    def __init__(self, images):
+        self.images = images
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if url not in self.images:
+            return FakeResponse(404)
+        content = self.images[url]
+        etag = f'"{len(content)}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, content, {'ETag': etag})
+
+
+def test_product_image_urls():
+    p = Product()
+    p.img = 'https://cdn/a.png'
+    p.sized_images = {'small': 'https://cdn/a-s.png', 'large': 'https://cdn/a.png'}
+    assert product_image_urls(p) == ['https://cdn/a.png', 'https://cdn/a-s.png']
+
+
+def test_image_store_sync(tmp_path):
+    session = FakeSession({
+        'https://cdn/a.png': b'image-a',
+        'https://cdn/a-copy.png': b'image-a',
+        'https://cdn/b.jpg': b'image-bb',
+    })
+    store = ImageStore(tmp_path)
+    urls = ['https://cdn/a.png', '/a-copy.png', 'https://cdn/b.jpg', 'https://cdn/missing.png']
+    outcomes = store.sync(urls, session, base_url='https://cdn/', max_workers=2)
+    assert outcomes == {'downloaded': 2, 'duplicate': 1, 'failed': 1}
+    assert store.path('https://cdn/a.png') == store.path('https://cdn/a-copy.png')
+    assert store.path('https://cdn/b.jpg').read_bytes() == b'image-bb'
+    assert len([f for f in (tmp_path / 'objects').rglob('*') if f.is_file()]) == 2
+
+    store = ImageStore(tmp_path)
+    outcomes = store.sync(urls[:3], session, base_url='https://cdn/')
+    assert outcomes == {'unchanged': 3}
+    assert all(headers.get('If-None-Match') for url, headers in session.requests[-3:])
+
+
+def test_image_store_keys_objects_by_content_only(tmp_path):
+    urls = ['https://cdn/x.jpg', 'https://cdn/x.jpeg', 'https://cdn/x']
+    session = FakeSession({url: b'same-bytes' for url in urls})
+    store = ImageStore(tmp_path)
+    outcomes = store.sync(urls, session, max_workers=1)
+    assert outcomes == {'downloaded': 1, 'duplicate': 2}
+    assert len({store.path(url) for url in session.images}) == 1
+    assert store.manifest['https://cdn/x.jpeg']['extension'] == '.jpeg'
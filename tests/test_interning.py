@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from src.jamberry.interning import Interner
+from src.jamberry.order import Order, OrderLineItem
+from src.jamberry.product import Product
+
+
+def make_order(status, sku, price):
+    o = Order()
+    o.status = ''.join(status)  # a fresh string object, as the JSON parser would produce
+    li = OrderLineItem()
+    li.sku = ''.join(sku)
+    li.name = 'Cotton ' + 'Candy'
+    li.price = price
+    o.line_items = [li]
+    return o
+
+
+def test_interner_shares_values_and_links_products():
+    p = Product()
+    p.sku = ['JN001']
+    p.title = 'Cotton Candy'
+    interner = Interner([p])
+    a, b = interner.orders([
+        make_order(['Ship', 'ped'], ['JN', '001'], Decimal('15.00')),
+        make_order(['Shi', 'pped'], ['JN0', '01'], Decimal('15.00')),
+    ])
+    assert a.status is b.status
+    assert a.line_items[0].sku is b.line_items[0].sku
+    assert a.line_items[0].name is b.line_items[0].name
+    assert a.line_items[0].price is b.line_items[0].price
+    assert a.line_items[0].product is p
+
+
+def test_interner_keeps_distinct_values_apart():
+    interner = Interner()
+    assert interner.value(Decimal('1.0')) is not interner.value(Decimal('1.00'))
+    assert interner.value(1) is not interner.value(True)
+    assert type(interner.value(1.0)) is float
+    assert interner.value(1) == 1
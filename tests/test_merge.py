@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from src.jamberry.customer import Customer
+from src.jamberry.merge import merge_customers, match_report, normalize_address
+
+
+def make_customer(name, line1, zip_code, **kwargs):
+    c = Customer()
+    c.name = name
+    c.address_line_1 = line1
+    c.address_zip = zip_code
+    for k, v in kwargs.items():
+        setattr(c, k, v)
+    return c
+
+
+def test_normalize_address():
+    assert normalize_address('123 Main Street.', '12345-6789') == normalize_address('123 main st', '12345')
+
+
+def test_merge_customers():
+    volume = [
+        make_customer('Ima Customer', '123 Main St', '12345', id='1'),
+        make_customer('Jane Doe', '9 Elm Avenue', '54321', id='2'),
+        make_customer('J. Smith', '77 Oak Rd', '11111', id='3'),
+        make_customer('Nobody', '1 Nowhere', '00000', id='4'),
+    ]
+    angel = [
+        make_customer('IMA CUSTOMER', '123 Main Street', '12345-0001', email='ima@example.com'),
+        make_customer('Jane Doe', 'PO Box 5', '54321', email='jane@example.com'),
+        make_customer('John Smith', '77 Oak Road', '11111', birthdate=datetime(1980, 1, 1)),
+        make_customer('Extra Person', '5 Pine Ct', '22222'),
+    ]
+    matches = merge_customers(volume, angel)
+    by_id = {m.volume.id: m for m in matches if m.volume is not None}
+    assert by_id['1'].method == 'exact'
+    assert by_id['1'].customer.email == 'ima@example.com'
+    assert by_id['1'].customer.name == 'Ima Customer'
+    assert by_id['2'].method == 'name+zip'
+    assert by_id['3'].method == 'address'
+    assert by_id['3'].customer.birthdate == datetime(1980, 1, 1)
+    assert by_id['4'].angel is None
+    assert match_report(matches) == {'exact': 1, 'name+zip': 1, 'address': 1, 'unmatched': 2}
+
+    # an exact match wins even when a weaker match for the same record comes first
+    volume = [
+        make_customer('Jane Doe', '5 Other Rd', '99999', id='1'),
+        make_customer('Jane Doe', '9 Elm Ave', '54321', id='2'),
+    ]
+    angel = [make_customer('Jane Doe', '9 Elm Ave', '54321')]
+    by_id = {m.volume.id: m for m in merge_customers(volume, angel)}
+    assert by_id['2'].method == 'exact'
+    assert by_id['1'].method == 'unmatched'
+
+    # two customers competing for one record in the same tier get neither
+    twins = [
+        make_customer('Sam Roe', '1 A St', '11111', id='3'),
+        make_customer('Sam Roe', '2 B St', '11111', id='4'),
+    ]
+    matches = merge_customers(twins, [make_customer('Sam Roe', 'PO Box 9', '11111')])
+    assert match_report(matches) == {'unmatched': 3}
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from src.jamberry.parsers import parse_team_activity_csv, parse_team_activity_row
+from tests.fixtures.workstation import make_tar_row
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+
+def test_parsers_import_without_browser_stack():
+    code = (
+        'import sys\n'
+        'import jamberry, jamberry.parsers, jamberry.serialize\n'
+        'heavy = {"mechanicalsoup", "bs4", "requests", "dateutil", "multiprocessing"} & set(sys.modules)\n'
+        'assert not heavy, heavy\n'
+        'assert jamberry.JamberryWorkstation.__name__ == "JamberryWorkstation"\n'
+        'assert "mechanicalsoup" in sys.modules\n'
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=str(SRC), check=True)
+
+
+def test_parse_team_activity_row():
+    c, a = parse_team_activity_row(make_tar_row(7, level=3, qv='$1,234.50'))
+    assert c.id == '7'
+    assert c.downline_level == 3
+    assert c.start_date.year == 2017
+    assert a.qv == Decimal('1234.50')
+    assert a.last_login == ''
+    assert a.highest_title == 'Consultant'
+
+
+def test_parse_team_activity_row_columns():
+    c, a = parse_team_activity_row(make_tar_row(7, level=3), columns=('Contact', 'DLL', 'Sponsor', 'QV'))
+    assert (c.id, c.downline_level, a.sponsor_name, a.qv) == ('7', 3, 'Sponsor Name', Decimal('100.00'))
+    assert not hasattr(c, 'start_date')
+    assert not hasattr(a, 'rv')
+    with pytest.raises(ValueError):
+        parse_team_activity_row(make_tar_row(7), columns=('Nope',))
+
+
+@pytest.mark.usefixtures('tar_csv_data')
+def test_parse_team_activity_csv_columns(tar_csv_data):
+    rows = list(parse_team_activity_csv(tar_csv_data, columns=['Contact', 'QV']))
+    assert len(rows) == 50
+    assert rows[0][0].id == '1'
+    assert not hasattr(rows[0][0], 'downline_level')
@@ -0,0 +1,52 @@
+from src.jamberry.product import Product
+from src.jamberry.search import ProductIndex, tokenize
+
+
+def make_product(sku, title, tags=(), product_type='Nail Wrap', nas_design=False):
+    p = Product()
+    p.sku = sku
+    p.title = title
+    p.tags = list(tags)
+    p.product_type = product_type
+    p.nas_design = nas_design
+    return p
+
+
+def make_index():
+    return ProductIndex([
+        make_product('JN001', 'Cotton Candy Kisses', tags=['pink', 'sparkle']),
+        make_product(['JN002'], 'Blue Lagoon', tags=['blue', 'ocean']),
+        make_product('JT100', 'Base Coat', product_type='Lacquer'),
+        make_product('JN003', 'Pink Panther', tags=['pink']),
+    ])
+
+
+def test_tokenize():
+    assert tokenize('Cotton-Candy KISSES #2') == ['cotton', 'candy', 'kisses', '2']
+
+
+def test_search_exact_and_prefix():
+    index = make_index()
+    assert len(index) == 4
+    assert [p.sku for p in index.search('jn001')] == ['JN001']
+    assert [p.title for p in index.search('cott can')] == ['Cotton Candy Kisses']
+    assert [p.sku for p in index.search('pink')] == ['JN003', 'JN001']
+    assert index.get('JN002').title == 'Blue Lagoon'
+    assert index.search('lacq')[0].sku == 'JT100'
+
+
+def test_search_fuzzy():
+    index = make_index()
+    assert [p.title for p in index.search('lagon')] == ['Blue Lagoon']
+    assert [p.title for p in index.search('panhter')] == []
+    assert [p.title for p in index.search('pantehr pink')] == []
+    assert [p.title for p in index.search('panter')] == ['Pink Panther']
+    assert index.search('lagon', fuzzy=False) == []
+
+
+def test_add_replaces_same_sku():
+    index = make_index()
+    index.add(make_product('JN001', 'Renamed Wrap'))
+    assert len(index) == 4
+    assert index.search('cotton') == []
+    assert index.search('renamed')[0].sku == 'JN001'
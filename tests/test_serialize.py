@@ -0,0 +1,67 @@
+import copy
+import io
+import pickle
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.jamberry.consultant import Consultant
+from src.jamberry.model import same_values
+from src.jamberry.order import Order, OrderLineItem
+from src.jamberry import serialize
+
+
+def make_order():
+    o = Order()
+    o.id = 123
+    o.order_date = datetime(2018, 3, 1, 12, 30)
+    o.qv = Decimal('45.00')
+    o.status = 'Shipped'
+    li = OrderLineItem()
+    li.sku = 'JN001'
+    li.quantity = 2
+    li.total = Decimal('30.00')
+    o.line_items = [li]
+    return o
+
+
+def test_model_dict_round_trip():
+    c = Consultant()
+    c.id = '42'
+    c.first_name = 'Ima'
+    assert c.to_dict() == {'id': '42', 'first_name': 'Ima'}
+    assert same_values(Consultant.from_dict({'id': '42', 'first_name': 'Ima', 'unknown': 1}), c)
+    assert not hasattr(Consultant.from_dict(c.to_dict()), 'last_name')
+
+
+def test_pickle_and_copy_partial_slots():
+    o = make_order()
+    assert same_values(pickle.loads(pickle.dumps(o)), o)
+    clone = copy.deepcopy(o)
+    assert same_values(clone, o)
+    assert clone.line_items[0] is not o.line_items[0]
+    assert not hasattr(clone, 'tax')
+
+
+def test_json_round_trip():
+    orders = [make_order(), make_order()]
+    assert same_values(serialize.from_json(serialize.to_json(orders)), orders)
+    f = io.StringIO()
+    serialize.dump_json_lines(orders, f)
+    f.seek(0)
+    assert same_values(list(serialize.load_json_lines(f)), orders)
+
+
+def test_binary_round_trip():
+    orders = [make_order(), make_order()]
+    assert same_values(serialize.loads(serialize.dumps(orders)), orders)
+    with pytest.raises(ValueError):
+        serialize.loads(b'nope')
+
+
+def test_models_keep_identity_hashing():
+    a, b = Consultant(), Consultant()
+    assert len({a, b}) == 2
+    assert a != b
+    assert same_values(a, b)
@@ -0,0 +1,93 @@
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from src.jamberry.service import SingleFlightCache, WorkstationClient, make_server
+from tests.fixtures.workstation import FakeClock, OfflineWorkstation
+
+
+class CountingWorkstation(OfflineWorkstation):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def fetch_team_activity_csv(self, year=None, month=None, levels='9999', columns=None):
+        self.calls += 1
+        time.sleep(0.05)
+        return f'Contact\n{year}{month}\n'.encode('utf-8')
+
+    def fetch_orders_api(self, start_date='2014-01-01', end_date=None):
+        yield {'orderID': 1}
+
+    def fetch_customer_volume_json(self):
+        return {}['rows']
+
+
+def test_single_flight_cache_coalesces():
+    cache = SingleFlightCache(ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('k', loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+    assert cache.get('k', loader) == 'value'
+    assert len(calls) == 1
+
+
+def test_single_flight_cache_evicts():
+    clock = FakeClock()
+    cache = SingleFlightCache(ttl=10, clock=clock, max_entries=3)
+    for key in 'abc':
+        cache.get(key, lambda: key)
+        clock.now += 1
+    cache.get('d', lambda: 'd')
+    assert len(cache) == 3
+    assert cache.get('a', lambda: 'reloaded') == 'reloaded'
+    clock.now += 20
+    cache.get('e', lambda: 'e')
+    assert len(cache) == 1
+
+
+def test_service_round_trip():
+    ws = CountingWorkstation()
+    server = make_server(ws, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = WorkstationClient(f'http://127.0.0.1:{server.server_address[1]}')
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.fetch_team_activity_csv(year=2018, month=3)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [b'Contact\n20183\n'] * 4
+        assert ws.calls == 1
+        assert client.fetch_orders_api() == [{'orderID': 1}]
+        for path, status in [
+            ('/fetch/nope', 404),
+            ('/fetch/fetch_orders_api?args=%7Bbad', 400),
+            ('/fetch/fetch_customer_volume_json', 502),
+        ]:
+            with pytest.raises(HTTPError) as e:
+                urlopen(client.url + path)
+            assert e.value.code == status
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,83 @@
+from src.jamberry.tracking import TrackingCache, is_terminal, tracking_status
+from tests.fixtures.workstation import FakeClock, OfflineWorkstation
+
+
+class TrackingWorkstation(OfflineWorkstation):
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.fetched = []
+
+    def fetch_order_tracking(self, order_id):
+        self.fetched.append(order_id)
+        return self.responses[order_id]
+
+
+def test_tracking_status():
+    result = {'shipments': [{'trackingNumber': '1Z', 'shipmentStatus': 'Delivered'}]}
+    assert tracking_status(result) == 'Delivered'
+    assert is_terminal(result)
+    assert not is_terminal({'shipments': [{'shipmentStatus': 'In Transit'}]})
+    assert not is_terminal({'status': 'Undelivered'})
+    assert not is_terminal({'status': 'Not Delivered'})
+    assert is_terminal({'status': 'DELIVERED - left at front door'})
+
+
+def test_tracking_status_skips_address_state():
+    result = {'shipTo': {'city': 'Lexington', 'state': 'KY'}, 'state': 'KY', 'trackingState': 'In Transit'}
+    assert tracking_status(result) == 'In Transit'
+    result = {'address': {'shipmentState': 'KY'}, 'shipments': [{'status': 'Delivered'}]}
+    assert tracking_status(result) == 'Delivered'
+
+
+def test_tracking_cache_backoff():
+    clock = FakeClock()
+    cache = TrackingCache(base_interval=10, max_interval=30, clock=clock)
+    assert cache.is_due('1')
+    cache.update('1', {'status': 'In Transit'})
+    assert not cache.is_due('1')
+    clock.now += 10
+    assert cache.is_due('1')
+    cache.update('1', {'status': 'In Transit'})
+    assert cache.next_poll('1') == clock.now + 20
+    cache.update('1', {'status': 'In Transit'})
+    assert cache.next_poll('1') == clock.now + 30
+    cache.update('1', {'status': 'Delivered'})
+    assert cache.next_poll('1') is None
+
+
+def test_fetch_order_tracking_batch():
+    ws = TrackingWorkstation({
+        '1': {'status': 'Delivered'},
+        '2': {'status': 'In Transit'},
+    })
+    ws.tracking_cache.clock = FakeClock()
+    results = ws.fetch_order_tracking_batch([1, 2, 2])
+    assert results == {'1': {'status': 'Delivered'}, '2': {'status': 'In Transit'}}
+    assert sorted(ws.fetched) == ['1', '2']
+    ws.fetch_order_tracking_batch([1, 2])
+    assert len(ws.fetched) == 2
+    ws.fetch_order_tracking_batch([1, 2], force=True)
+    assert sorted(ws.fetched) == ['1', '2', '2']
+
+
+def test_fetch_order_tracking_batch_real_clock():
+    ws = TrackingWorkstation({'1': {'status': 'In Transit'}, '2': {'status': 'Delivered'}})
+    results = ws.fetch_order_tracking_batch([1, 2])
+    assert results == {'1': {'status': 'In Transit'}, '2': {'status': 'Delivered'}}
+    assert sorted(ws.fetched) == ['1', '2']
+
+
+def test_fetch_order_tracking_batch_keeps_other_results_on_failure():
+    class FlakyWorkstation(TrackingWorkstation):
+        def fetch_order_tracking(self, order_id):
+            if order_id == '2':
+                raise IOError('tracking failed')
+            return super().fetch_order_tracking(order_id)
+
+    ws = FlakyWorkstation({'1': {'status': 'In Transit'}, '3': {'status': 'Delivered'}})
+    results = ws.fetch_order_tracking_batch([1, 2, 3])
+    assert results == {'1': {'status': 'In Transit'}, '2': None, '3': {'status': 'Delivered'}}
+    assert list(ws.tracking_cache.errors) == ['2']
+    assert '1' in ws.tracking_cache and '3' in ws.tracking_cache
+    assert ws.tracking_cache.is_due('2')
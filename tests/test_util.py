@@ -1,5 +1,5 @@
 from decimal import Decimal
-from src.jamberry.util import currency_to_decimal
+from src.jamberry.util import currency_to_decimal, date_shards
 
 
 def test_currency_to_decimal():
@@ -25,3 +25,17 @@ def test_currency_to_decimal():
 
     result = currency_to_decimal('$1,342.63 USD')
     assert result == Decimal('1342.63')
+
+
+def test_date_shards():
+    assert date_shards('2018-01-15', '2018-03-02') == [
+        ('2018-01-15', '2018-01-31'),
+        ('2018-02-01', '2018-02-28'),
+        ('2018-03-01', '2018-03-02'),
+    ]
+    assert date_shards('2018-02-15', '2018-12-31', months=3) == [
+        ('2018-02-15', '2018-03-31'),
+        ('2018-04-01', '2018-06-30'),
+        ('2018-07-01', '2018-09-30'),
+        ('2018-10-01', '2018-12-31'),
+    ]
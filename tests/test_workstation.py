@@ -1,4 +1,5 @@
 import csv
+import time
 from decimal import Decimal
 
 from itertools import islice
@@ -8,7 +9,9 @@ import pytest
 from bs4 import BeautifulSoup
 
 from src.jamberry.workstation import extract_shipping_address, extract_line_items, parse_order_row_soup, \
-    JamberryWorkstation
+    JamberryWorkstation, parse_team_activity_csv, tar_trans_param, tar_level_shards
+from src.jamberry.model import same_values
+from tests.fixtures.workstation import OfflineWorkstation, make_tar_csv, make_tar_row
 
 
 # uncomment these lines to see requests
@@ -146,3 +149,101 @@ def test_ws_no_config_file():
 def test_catalog_products(ws):
     for p in ws.catalog_products():
         assert p.sku is not None
+
+
+@pytest.mark.usefixtures('tar_csv_data')
+def test_parse_team_activity_csv_process_pool(tar_csv_data):
+    serial = list(parse_team_activity_csv(tar_csv_data))
+    parallel = list(parse_team_activity_csv(tar_csv_data, processes=2, chunk_size=7))
+    assert len(serial) == len(parallel) == 50
+    assert same_values([c for c, a in parallel], [c for c, a in serial])
+    assert [a.qv for c, a in parallel] == [a.qv for c, a in serial]
+    assert parallel[0][1].dqv == Decimal('-5.00')
+
+    rows = [make_tar_row(contact) for contact in range(1, 7)]
+    rows[2]['Address'] = 'Apt 4\nBuilding B'
+    multiline = make_tar_csv(rows)
+    serial = list(parse_team_activity_csv(multiline))
+    parallel = list(parse_team_activity_csv(multiline, processes=2, chunk_size=2))
+    assert [c.id for c, a in parallel] == [c.id for c, a in serial] == [str(i) for i in range(1, 7)]
+    assert parallel[2][0].address_line1 == 'Apt 4\nBuilding B'
+
+
+class OrderHistoryWorkstation(OfflineWorkstation):
+    """Serves a fake order history two orders per page, newest first."""
+    page_size = 2
+
+    def __init__(self, orders):
+        super().__init__()
+        self.order_history = orders
+
+    def fetch_orders_api_page(self, start_date, end_date, page):
+        matching = [o for o in self.order_history if start_date <= o['orderedDate'][:10] <= end_date]
+        matching.sort(key=lambda o: o['orderedDate'], reverse=True)
+        content = matching[page * self.page_size:(page + 1) * self.page_size]
+        last = (page + 1) * self.page_size >= len(matching)
+        return {'orderHistoryPage': {'content': content, 'last': last}}
+
+
+def test_fetch_orders_api_sharded():
+    history = [
+        {'orderID': i, 'orderedDate': f'2018-{month:02d}-{day:02d}T10:00:00'}
+        for i, (month, day) in enumerate([(1, 5), (1, 20), (1, 31), (2, 1), (3, 3), (3, 9), (3, 30), (5, 1)])
+    ]
+    ws = OrderHistoryWorkstation(history)
+    sharded = list(ws.fetch_orders_api_sharded('2018-01-01', '2018-05-31', shard_months=1))
+    assert [o['orderID'] for o in sharded] == list(reversed(range(8)))
+    unsharded = list(ws.fetch_orders_api('2018-01-01', '2018-05-31'))
+    assert [o['orderID'] for o in unsharded] == [o['orderID'] for o in sharded]
+
+
+def test_tar_trans_param():
+    assert tar_trans_param().endswith('sponsor|Sponsor,sponsorEmail|Sponsor Email')
+    assert tar_trans_param(['QV', 'Contact']).endswith('In Progress|In Progress,contact|Contact,qv|QV')
+    with pytest.raises(ValueError):
+        tar_trans_param(['Nope'])
+
+
+class ShardedTarWorkstation(OfflineWorkstation):
+    """Serves TAR level ranges from fixture rows; the (2, 2) shard fails on its first attempt."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = [make_tar_row(contact, level=1 + contact % 4) for contact in range(1, 41)]
+        self.requests = []
+
+    def fetch_team_activity_csv_shard(self, min_level, max_level, year=None, month=None, columns=None):
+        self.requests.append((min_level, max_level))
+        if (min_level, max_level) == (2, 2) and self.requests.count((2, 2)) == 1:
+            raise IOError('shard failed')
+        rows = [r for r in self.rows if min_level <= int(r['DLL']) <= max_level]
+        return make_tar_csv(sorted(rows, key=lambda r: int(r['DLL'])))
+
+
+def test_tar_level_shards():
+    assert tar_level_shards(2, 7) == [(2, 2), (3, 3), (4, 5), (6, 7)]
+
+
+def test_downline_consultants_level_shards():
+    ws = ShardedTarWorkstation()
+    chunks = list(ws.fetch_team_activity_csv_sharded(max_level=4, retry_delay=0))
+    assert len(chunks) == 4
+    assert ws.requests.count((2, 2)) == 2
+    assert ws.requests.count((1, 1)) == 1
+    consultants = list(ws.downline_consultants(level_shards=[(1, 2), (3, 9999)], columns=['Contact', 'DLL']))
+    assert len(consultants) == 40
+    levels = [c.downline_level for c, a in consultants]
+    assert levels == sorted(levels)
+
+
+def test_sharded_tar_retry_backoff_respects_deadline():
+    class FailingTarWorkstation(OfflineWorkstation):
+        def fetch_team_activity_csv_shard(self, min_level, max_level, year=None, month=None, columns=None):
+            raise IOError('shard failed')
+
+    ws = FailingTarWorkstation()
+    started = time.monotonic()
+    result = ws.downline_consultants(deadline=0.2, level_shards=[(1, 9999)])
+    assert list(result) == []
+    assert not result.complete
+    assert time.monotonic() - started < 1